@@ -0,0 +1,344 @@
+import heapq
+import random
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+import streamlit as st
+from backend.controller.itemController import connect_item_db, get_items_by_id_and_tier, occupies_capacity, occupies_capacity_sql, ORDER_KEY_STEP
+from backend.database.changeTracker import cached_until_changed
+from backend.database.connectionManager import get_attached_connection
+from utils.commonUtils import get_purpose_color_and_value
+from utils.constants import Item_Status, Purpose_Lookup
+
+# Approval items go before discussion items, which go before information items
+PURPOSE_WEIGHTS = {
+    Purpose_Lookup.APPROVAL.value: 3,
+    Purpose_Lookup.DISCUSSION.value: 2,
+    Purpose_Lookup.INFO.value: 1,
+}
+PURPOSE_WEIGHT_SCALE = 1000  # One purpose step outweighs any waiting time
+MAX_WAITING_DAYS = 365  # Waiting longer than this earns no more priority
+
+WAITLIST_STATUSES = (Item_Status.WAITLIST.value, Item_Status.WAITLISTED.value)
+# Compete for the agenda; every other item that takes up time, e.g. an approved one, is kept
+CANDIDATE_STATUSES = (Item_Status.PENDING.value, Item_Status.REGISTERED.value) + WAITLIST_STATUSES
+RESCHEDULED_STATUS = Item_Status.PENDING.value  # Moved items are reviewed again in their new meeting
+ITEM_ATTENDANCE_TABLES = ("item_owners", "additional_attendees", "nonselect_attendance")
+
+
+def waiting_days(item, now):
+    """Days since the item was registered."""
+    if not item["createdOn"]:
+        return 0
+    return min(max(int((now - item["createdOn"]) // 86400), 0), MAX_WAITING_DAYS)
+
+
+def item_priority(item, now):
+    """Knapsack value of an item: its purpose weight, then one point per day it has waited."""
+    _, purpose = get_purpose_color_and_value(item["purpose"] or "")
+    return PURPOSE_WEIGHTS.get(purpose, 0) * PURPOSE_WEIGHT_SCALE + waiting_days(item, now)
+
+
+def pack_agenda(candidates, capacity, now=None):
+    """
+    Picks the candidates of highest total priority that fit in capacity minutes.
+
+    Solved as a 0/1 knapsack over minutes. At most capacity // d items of duration d
+    fit, so only the best of those are considered, which keeps the work bounded by
+    the capacity rather than the number of candidates. Items without a duration always fit.
+
+    Parameters:
+        candidates: Items with id, duration, purpose and createdOn.
+        now (float): UNIX time waiting days are counted to, defaults to the current time.
+
+    Returns:
+        list: The chosen candidates in presentation order, by purpose and then longest waiting.
+    """
+    now = time.time() if now is None else now
+    capacity = max(int(capacity or 0), 0)
+
+    chosen = []
+    by_duration = defaultdict(list)
+    for item in candidates:
+        duration = int(item["duration"] or 0)
+        if duration <= 0:
+            chosen.append((item_priority(item, now), item))
+        elif duration <= capacity:
+            by_duration[duration].append((item_priority(item, now), item))
+
+    pool = []
+    for duration, group in by_duration.items():
+        pool.extend((duration, value, item) for value, item in heapq.nlargest(capacity // duration, group, key=lambda pair: pair[0]))
+
+    # best[c] is the highest total value within c minutes; improved[i][c] marks where item i raised it
+    best = [0] * (capacity + 1)
+    improved = []
+    for duration, value, _ in pool:
+        row = bytearray(capacity + 1)
+        for c in range(capacity, duration - 1, -1):
+            with_item = best[c - duration] + value
+            if with_item > best[c]:
+                best[c] = with_item
+                row[c] = 1
+        improved.append(row)
+
+    remaining = capacity
+    for i in range(len(pool) - 1, -1, -1):
+        if improved[i][remaining]:
+            duration, value, item = pool[i]
+            chosen.append((value, item))
+            remaining -= duration
+
+    chosen.sort(key=lambda pair: (-pair[0], pair[1]["id"]))
+    return [item for _, item in chosen]
+
+
+def propose_agenda(meeting_id, total_duration):
+    """
+    Proposes the Tier 1 agenda of a meeting that fits in total_duration minutes.
+
+    Pending, registered and waitlisted items compete for the minutes left after the
+    kept items, those that take up the meeting's time (see occupies_capacity) but
+    are not candidates, such as approved ones. Proposals are cached until the Item table changes.
+
+    Returns:
+        dict: kept and chosen items in proposed order, left_out (every other Tier 1 item,
+        rejected ones included), minutesUsed and minutesLeft.
+    """
+    return _propose_agenda(int(meeting_id), int(total_duration or 0), date.today().isoformat())
+
+
+@cached_until_changed("item.db", "Item")
+def _propose_agenda(meeting_id, total_duration, today):
+    items = get_items_by_id_and_tier(meeting_id, 1)
+    kept = [item for item in items if occupies_capacity(item.status) and item.status not in CANDIDATE_STATUSES]
+    candidates = [item for item in items if item.status in CANDIDATE_STATUSES]
+    reserved = sum(item.duration or 0 for item in kept)
+
+    chosen = pack_agenda(candidates, total_duration - reserved)
+    on_agenda = {item.id for item in kept + chosen}
+    minutes_used = reserved + sum(item.duration or 0 for item in chosen)
+    return {
+        "kept": kept,
+        "chosen": chosen,
+        "left_out": [item for item in items if item.id not in on_agenda],
+        "minutesUsed": minutes_used,
+        "minutesLeft": total_duration - minutes_used,
+    }
+
+
+def agenda_proposal_updates(proposal):
+    """Returns (itemOrder, id) of the items whose order a proposal changes."""
+    ordered = proposal["kept"] + proposal["chosen"]
+    new_keys = [(item, ORDER_KEY_STEP * position) for position, item in enumerate(ordered, start=1)]
+    new_keys += [(item, 0) for item in proposal["left_out"]]
+    return [(key, item.id) for item, key in new_keys if item.itemOrder != key]
+
+
+def apply_agenda_proposal(proposal):
+    """
+    Orders the agenda as proposed: kept items first, then the chosen ones; left out items are taken off it.
+
+    Item statuses are left for the secretariat to set.
+
+    Returns:
+        int: Number of items whose itemOrder changed, or None if nothing was written.
+    """
+    updates = agenda_proposal_updates(proposal)
+
+    conn = connect_item_db()
+    try:
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("UPDATE Item SET itemOrder = ? WHERE id = ?", updates)
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"An error occurred while applying the agenda proposal: {e}")
+        st.error("The proposed agenda could not be applied.")
+        return None
+    st.toast("Agenda reordered as proposed")
+    return len(updates)
+
+
+def _plan_waitlist_moves(cursor, today, now):
+    """
+    Assigns waitlisted items to upcoming meetings with enough time left, highest priority first.
+
+    Each item goes to the earliest upcoming meeting after its own one whose
+    totalDuration minus the durations of its scheduled items still fits it.
+
+    Returns:
+        tuple: (moves, unplaced) where moves are dicts of id, title, fromMeetingId,
+        toMeetingId and toMeeting (the meeting's title and date), and unplaced are
+        the waitlisted items no meeting has room for.
+    """
+    cursor.row_factory = sqlite3.Row
+    capacity_condition, capacity_params = occupies_capacity_sql("i.status")
+    meetings = cursor.execute(
+        f"""
+        SELECT m.id, m.meetingTitle, m.meetingDate, m.startTime,
+               COALESCE(m.totalDuration, 0) - (
+                   SELECT COALESCE(SUM(i.duration), 0)
+                   FROM item.Item i
+                   WHERE i.meetingId = m.id
+                   AND {capacity_condition}
+               ) AS minutesLeft
+        FROM main.meeting m
+        WHERE m.meetingDate >= ?
+        ORDER BY m.meetingDate, m.startTime, m.id
+        """,
+        (*capacity_params, today),
+    ).fetchall()
+    minutes_left = [meeting["minutesLeft"] for meeting in meetings]
+
+    waitlisted = cursor.execute(
+        f"""
+        SELECT i.id, i.title, i.duration, i.purpose, i.createdOn, i.meetingId,
+               COALESCE(m.meetingDate, '') AS meetingDate, COALESCE(m.startTime, '') AS startTime
+        FROM item.Item i
+        LEFT JOIN main.meeting m ON m.id = i.meetingId
+        WHERE i.status IN ({", ".join("?" * len(WAITLIST_STATUSES))})
+        """,
+        WAITLIST_STATUSES,
+    ).fetchall()
+    waitlisted.sort(key=lambda item: (-item_priority(item, now), item["id"]))
+
+    moves = []
+    unplaced = []
+    for item in waitlisted:
+        duration = item["duration"] or 0
+        for i, meeting in enumerate(meetings):
+            if (meeting["meetingDate"], meeting["startTime"]) <= (item["meetingDate"], item["startTime"]) or meeting["id"] == item["meetingId"]:
+                continue
+            if minutes_left[i] >= duration:
+                minutes_left[i] -= duration
+                moves.append({
+                    "id": item["id"],
+                    "title": item["title"],
+                    "fromMeetingId": item["meetingId"],
+                    "toMeetingId": meeting["id"],
+                    "toMeeting": f"{meeting['meetingTitle']} ({meeting['meetingDate']})",
+                })
+                break
+        else:
+            unplaced.append(dict(item))
+    return moves, unplaced
+
+
+def plan_waitlist_rescheduling():
+    """
+    Returns the (moves, unplaced) reschedule_waitlisted_items would make now, without writing anything.
+
+    Plans are cached until the Item or meeting table changes.
+    """
+    return _plan_waitlist_rescheduling(date.today().isoformat())
+
+
+@cached_until_changed("item.db", "Item", depends_on=[("meeting.db", ["meeting"])])
+def _plan_waitlist_rescheduling(today):
+    conn = get_attached_connection("meeting.db", ["item.db"])
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        return _plan_waitlist_moves(cursor, today, time.time())
+    finally:
+        conn.rollback()
+
+
+def reschedule_waitlisted_items():
+    """
+    Moves every waitlisted item that fits to the next upcoming meeting with time for it.
+
+    Items are placed in priority order, as ranked by item_priority. A moved item is
+    set back to Pending and off the agenda, and its item owners, additional attendees
+    and attendance rows move with it.
+
+    SQLite in WAL mode commits each attached database atomically, but not the
+    databases together, so attendance.db is committed first and item.db last.
+    A run that stops in between leaves only attendance rows ahead of items that
+    are still waitlisted; the next run moves those items, and their rows follow
+    them from wherever they are.
+
+    Returns:
+        tuple: (moves, unplaced) as in plan_waitlist_rescheduling, or None if nothing was written.
+    """
+    conn = get_attached_connection("meeting.db", ["item.db", "attendance.db"])
+    cursor = conn.cursor()
+    try:
+        conn.commit()
+        cursor.execute("BEGIN IMMEDIATE")
+        moves, unplaced = _plan_waitlist_moves(cursor, date.today().isoformat(), time.time())
+        cursor.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS item_moves (
+                item_id INTEGER PRIMARY KEY,
+                meeting_id INTEGER NOT NULL
+            )
+            """
+        )
+        cursor.execute("DELETE FROM temp.item_moves")
+        cursor.executemany(
+            "INSERT INTO temp.item_moves VALUES (?, ?)",
+            [(move["id"], move["toMeetingId"]) for move in moves],
+        )
+        for table in ITEM_ATTENDANCE_TABLES:
+            cursor.execute(
+                f"""
+                UPDATE OR REPLACE attendance.{table}
+                SET meeting_id = moves.meeting_id
+                FROM temp.item_moves moves
+                WHERE moves.item_id = {table}.item_id
+                AND {table}.meeting_id IS NOT moves.meeting_id
+                """
+            )
+        conn.commit()
+
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            """
+            UPDATE item.Item
+            SET meetingId = moves.meeting_id, status = ?, itemOrder = 0
+            FROM temp.item_moves moves
+            WHERE moves.item_id = Item.id
+            """,
+            (RESCHEDULED_STATUS,),
+        )
+        cursor.execute("DELETE FROM temp.item_moves")
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"An error occurred while rescheduling waitlisted items: {e}")
+        st.error("Waitlisted items could not be rescheduled. Run it again to finish any moves left halfway.")
+        return None
+    st.toast(f"{len(moves)} waitlisted items rescheduled")
+    return moves, unplaced
+
+
+def benchmark_pack_agenda(candidate_count, capacity=150, runs=5):
+    """Returns the best time in seconds of pack_agenda over candidate_count random items."""
+    purposes = [f":blue[{Purpose_Lookup.APPROVAL.value}]", f":blue[{Purpose_Lookup.DISCUSSION.value}]", f":orange[{Purpose_Lookup.INFO.value}]"]
+    now = time.time()
+    candidates = [
+        {
+            "id": item_id,
+            "duration": random.randint(1, 30),
+            "purpose": random.choice(purposes),
+            "createdOn": now - random.uniform(0, 400 * 86400),
+        }
+        for item_id in range(candidate_count)
+    ]
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pack_agenda(candidates, capacity, now)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    # python -m backend.controller.agendaController [candidate counts...]
+    for count in [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000, 20000]:
+        print(f"pack_agenda: {count} candidates in {benchmark_pack_agenda(count) * 1000:.1f} ms")
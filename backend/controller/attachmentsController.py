@@ -1,52 +1,105 @@
 import streamlit as st
 from collections import defaultdict
-from pathlib import Path
+import hashlib
+import io
+import json
 import sqlite3
+import tempfile
+import time
 import pandas as pd
 from dataclasses import dataclass
+from backend.database.connectionManager import get_connection
+from backend.database.rowModels import RowModel, row_factory_for
+from backend.database.attachmentStore import CHUNK_SIZE, get_attachment_store
 
 MAX_FILE_SIZE = 200 * 1024 * 1024  # 200MB limit
+ATTACHMENT_STORE = "file"  # Where new uploads go, "sqlite" keeps the bytes inline in file_data
 
-@dataclass
-class Attachment:
+class BlobReader(io.RawIOBase):
+    """Read-only file object over an attachments.file_data BLOB, read incrementally through blobopen."""
+
+    def __init__(self, conn, attachment_id: int):
+        super().__init__()
+        self._blob = conn.blobopen("attachments", "file_data", attachment_id, readonly=True)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._blob.seek(offset, whence)
+        return self._blob.tell()
+
+    def tell(self):
+        return self._blob.tell()
+
+    def readinto(self, buffer):
+        chunk = self._blob.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    def close(self):
+        if not self.closed:
+            self._blob.close()
+        super().close()
+
+@dataclass(slots=True)
+class Attachment(RowModel):
+    """Metadata of a stored attachment, without its bytes."""
     id: int
-    itemId: int
+    item_id: int
     filename: str
-    fileType: str
-    fileData: bytes
+    file_type: str
+    file_size: int
+    upload_date: str
 
 def connect_attachment_db():
-    """Connects to the sqlite database."""
+    """Returns the shared connection to the attachment database."""
+    conn, _ = get_connection("attachment.db")
+    return conn
 
-    DB_FILENAME = Path(__file__).parent.parent / "database" / "attachment.db"
-    db_already_exists = DB_FILENAME.exists()
+def iter_upload_chunks(uploaded_file):
+    """Yields the upload in CHUNK_SIZE pieces, failing as soon as it grows past MAX_FILE_SIZE."""
+    size_error = ValueError(f"File size exceeds maximum limit of {MAX_FILE_SIZE/1024/1024}MB")
+    if getattr(uploaded_file, "size", 0) > MAX_FILE_SIZE:
+        raise size_error
 
-    conn = sqlite3.connect(DB_FILENAME)
-    db_was_just_created = not db_already_exists
-    if db_was_just_created:
-        initialize_attachment_table(conn)
+    uploaded_file.seek(0)
+    size = 0
+    while True:
+        chunk = uploaded_file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            raise size_error
+        yield chunk
 
-    return conn
+def insert_inline_attachment(cursor, item_id, filename, file_type, chunks):
+    """Spools chunks to a temporary file, then streams them into file_data through a BLOB handle."""
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.TemporaryFile() as spool:
+        for chunk in chunks:
+            digest.update(chunk)
+            spool.write(chunk)
+            size += len(chunk)
 
-def initialize_attachment_table(conn):
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS attachments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_id INTEGER,
-            filename TEXT NOT NULL,
-            file_type TEXT NOT NULL,
-            file_data BLOB NOT NULL,
-        )
-    """)
-    conn.commit()
+        cursor.execute("""
+            INSERT INTO attachments (item_id, filename, file_type, file_data, file_size, uploaded_on, sha256, storage)
+            VALUES (?, ?, ?, zeroblob(?), ?, ?, ?, 'sqlite')
+        """, (item_id, filename, file_type, size, size, int(time.time()), digest.hexdigest()))
+        attachment_id = cursor.lastrowid
+
+        spool.seek(0)
+        with cursor.connection.blobopen("attachments", "file_data", attachment_id) as blob:
+            while chunk := spool.read(CHUNK_SIZE):
+                blob.write(chunk)
+    return attachment_id
 
 def save_attachment(item_id: int, uploaded_file):
-    # Check file size
-    file_data = uploaded_file.read()
-    if len(file_data) > MAX_FILE_SIZE:
-        raise ValueError(f"File size exceeds maximum limit of {MAX_FILE_SIZE/1024/1024}MB")
-    
     # Validate file type
     file_type = uploaded_file.type
     # allowed_types = ['application/pdf', 'application/msword', 
@@ -56,39 +109,182 @@ def save_attachment(item_id: int, uploaded_file):
     # if file_type not in allowed_types:
     #     raise ValueError("File type not allowed")
     
+    # Size is checked while the upload is streamed, so the whole file is never held in memory
+    chunks = iter_upload_chunks(uploaded_file)
+    store = get_attachment_store(ATTACHMENT_STORE)
+    sha256 = None
     try:
+        if store is not None:
+            sha256, file_size = store.put_chunks(chunks)
+
         with connect_attachment_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO attachments (item_id, filename, file_type, file_data)
-                VALUES (?, ?, ?, ?)
-            """, (item_id, uploaded_file.name, file_type, file_data))
+            if store is not None:
+                cursor.execute("""
+                    INSERT INTO attachments (item_id, filename, file_type, file_data, file_size, uploaded_on, sha256, storage)
+                    VALUES (?, ?, ?, x'', ?, ?, ?, ?)
+                """, (item_id, uploaded_file.name, file_type, file_size, int(time.time()), sha256, store.name))
+                attachment_id = cursor.lastrowid
+            else:
+                attachment_id = insert_inline_attachment(cursor, item_id, uploaded_file.name, file_type, chunks)
             conn.commit()
-            return cursor.lastrowid
+            return attachment_id
     except sqlite3.Error as e:
         print(f"Error saving attachment: {e}")
+        if sha256 is not None:
+            # The file was stored but no row refers to it, unless another attachment has the same content
+            release_stored_files(connect_attachment_db(), [(store.name, sha256)])
         return None
 
 def get_attachments_for_item(item_id: int):
     with connect_attachment_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT id, filename, file_type, file_data,
-                    LENGTH(file_data) as file_size,
-                    datetime('now') as upload_date
+            SELECT id, filename, file_type, file_data, file_size,
+                    datetime(uploaded_on, 'unixepoch') as upload_date,
+                    sha256, storage
             FROM attachments
             WHERE item_id = ?
             ORDER BY filename
         """, (item_id,))
-        return [dict(zip([col[0] for col in cursor.description], row))
-                for row in cursor.fetchall()]
+        attachments = [dict(zip([col[0] for col in cursor.description], row))
+                       for row in cursor.fetchall()]
+
+    for attachment in attachments:
+        store = get_attachment_store(attachment.pop("storage"))
+        if store is not None:
+            attachment["file_data"] = store.read(attachment["sha256"])
+    return attachments
+
+def get_attachment_metadata_for_item(item_id: int):
+    """
+    List the attachments of an item without reading their file_data.
+
+    Returns:
+        list: One Attachment per attachment, ordered by filename.
+    """
+    cursor = connect_attachment_db().cursor()
+    cursor.row_factory = row_factory_for(Attachment)
+    cursor.execute("""
+        SELECT id, item_id, filename, file_type, file_size,
+                datetime(uploaded_on, 'unixepoch') as upload_date
+        FROM attachments
+        WHERE item_id = ?
+        ORDER BY filename
+    """, (item_id,))
+    return cursor.fetchall()
+
+def get_attachment_metadata_for_items(item_ids):
+    """
+    List the attachments of many items in one query, without reading their file_data.
+
+    Parameters:
+        item_ids (list): Ids of the items to look up.
+
+    Returns:
+        dict: Maps every requested item id to its list of Attachment rows.
+    """
+    attachments_by_item = {int(item_id): [] for item_id in item_ids}
+    if not attachments_by_item:
+        return attachments_by_item
+
+    cursor = connect_attachment_db().cursor()
+    cursor.row_factory = row_factory_for(Attachment)
+    cursor.execute("""
+        SELECT id, item_id, filename, file_type, file_size,
+                datetime(uploaded_on, 'unixepoch') as upload_date
+        FROM attachments
+        WHERE item_id IN (SELECT value FROM json_each(?))
+        ORDER BY item_id, filename
+    """, (json.dumps(list(attachments_by_item)),))
+    for attachment in cursor.fetchall():
+        attachments_by_item[attachment.item_id].append(attachment)
+    return attachments_by_item
+
+def get_attachment_data(attachment_id: int):
+    """Returns the file bytes of a single attachment, or None if it does not exist."""
+    try:
+        attachment_file = open_attachment(attachment_id)
+    except FileNotFoundError:
+        return None
+
+    with attachment_file:
+        return attachment_file.read()
+
+def open_attachment(attachment_id: int):
+    """
+    Opens an attachment for reading without loading it into memory.
+
+    Returns:
+        A binary file object positioned at the start of the content.
+
+    Raises:
+        FileNotFoundError: The attachment was deleted or its stored file is gone.
+    """
+    conn = connect_attachment_db()
+    row = conn.execute("SELECT storage, sha256 FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
+    if row is None:
+        raise FileNotFoundError(f"Attachment {attachment_id} no longer exists")
+
+    storage, sha256 = row
+    store = get_attachment_store(storage)
+    if store is not None:
+        if not store.exists(sha256):
+            raise FileNotFoundError(f"Stored file of attachment {attachment_id} no longer exists")
+        return store.open(sha256)
+    return BlobReader(conn, attachment_id)
+
+def attachment_available(attachment_id: int) -> bool:
+    """Returns whether an attachment can still be opened."""
+    try:
+        open_attachment(attachment_id).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+def read_attachment_for_download(attachment_id: int):
+    """
+    Deferred download_button data: the attachment's bytes, or empty bytes if it has gone since the page was drawn.
+
+    The file is read and closed here, so no handle outlives the download.
+    """
+    data = get_attachment_data(attachment_id)
+    if data is None:
+        print(f"Attachment {attachment_id} is no longer available")
+        return b""
+    return data
+
+def iter_attachment_chunks(attachment_id: int):
+    """Yields the content of an attachment in CHUNK_SIZE pieces."""
+    try:
+        attachment_file = open_attachment(attachment_id)
+    except FileNotFoundError:
+        return
+
+    with attachment_file:
+        while chunk := attachment_file.read(CHUNK_SIZE):
+            yield chunk
+
+def release_stored_files(conn, hashes):
+    """Deletes stored files whose content is no longer referenced by any attachment."""
+    for storage, sha256 in set(hashes):
+        store = get_attachment_store(storage)
+        if store is None:
+            continue
+        still_referenced = conn.execute(
+            "SELECT 1 FROM attachments WHERE sha256 = ? AND storage = ? LIMIT 1", (sha256, storage)
+        ).fetchone()
+        if still_referenced is None:
+            store.delete(sha256)
 
 def delete_attachment(attachment_id: int) -> bool:
     try:
         with connect_attachment_db() as conn:
             cursor = conn.cursor()
+            hashes = cursor.execute("SELECT storage, sha256 FROM attachments WHERE id = ?", (attachment_id,)).fetchall()
             cursor.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
             conn.commit()
+            release_stored_files(conn, hashes)
             return cursor.rowcount > 0
     except sqlite3.Error:
         return False
@@ -97,8 +293,39 @@ def delete_attachment_by_item_id(item_id: int) -> bool:
     try:
         with connect_attachment_db() as conn:
             cursor = conn.cursor()
+            hashes = cursor.execute("SELECT storage, sha256 FROM attachments WHERE item_id = ?", (item_id,)).fetchall()
             cursor.execute("DELETE FROM attachments WHERE item_id = ?", (item_id,))
             conn.commit()
+            release_stored_files(conn, hashes)
             return cursor.rowcount > 0
     except sqlite3.Error:
-        return False
\ No newline at end of file
+        return False
+
+def move_inline_attachments_to_store(store_name=ATTACHMENT_STORE) -> int:
+    """
+    Moves attachment bytes still kept inline in attachment.db into the given store.
+
+    Each row is streamed through a BLOB handle so no file is held in memory
+    whole. Run VACUUM afterwards to return the freed pages to the filesystem.
+
+    Returns:
+        int: The number of attachments moved.
+    """
+    store = get_attachment_store(store_name)
+    if store is None:
+        raise ValueError(f"Unknown attachment store: {store_name}")
+
+    moved = 0
+    with connect_attachment_db() as conn:
+        inline_ids = [row[0] for row in conn.execute("SELECT id FROM attachments WHERE storage = 'sqlite'")]
+        for attachment_id in inline_ids:
+            with conn.blobopen("attachments", "file_data", attachment_id, readonly=True) as blob:
+                sha256, file_size = store.put_chunks(iter(lambda: blob.read(CHUNK_SIZE), b""))
+            conn.execute("""
+                UPDATE attachments
+                SET file_data = x'', file_size = ?, sha256 = ?, storage = ?
+                WHERE id = ?
+            """, (file_size, sha256, store.name, attachment_id))
+            conn.commit()
+            moved += 1
+    return moved
\ No newline at end of file
@@ -1,36 +1,54 @@
 import streamlit as st
 from collections import defaultdict
-from pathlib import Path
 import sqlite3
+import json
 import pandas as pd
+from dataclasses import dataclass
+from backend.database.connectionManager import get_connection, get_attached_connection
+from backend.database.changeTracker import cached_until_changed
+from backend.database.rowModels import RowModel, field_names, row_factory_for
+
+
+@dataclass(slots=True)
+class SecretariatMember(RowModel):
+    PerNum: int
+    Name: str
+    Designation: str
+
+
+@dataclass(slots=True)
+class CoreMember(RowModel):
+    PerNum: int
+    Name: str
+    Designation: str
+    Role: str
+
+
+@dataclass(slots=True)
+class AttendanceRecord(RowModel):
+    PerNum: int
+    Name: str
+    Designation: str
+    MeetingId: int
+    ItemID: int
+    Attendance: int
+    Role: str
+    Remarks: str
+
+
+NONSELECT_ATTENDANCE_COLUMNS = list(field_names(AttendanceRecord))
 
 
 # Mock data for full personnel database
 def connect_personnel_db():
-    """Connects to the personnel sqlite database."""
-    DB_FILENAME = Path(__file__).parent.parent/ "database" / "personnel.db"
-    db_already_exists = DB_FILENAME.exists()
-
-    conn = sqlite3.connect(DB_FILENAME)
-    db_was_just_created = not db_already_exists
-    return conn, db_was_just_created
+    """Returns the shared connection to the personnel database."""
+    return get_connection("personnel.db")
 
 
 def initialize_personnel_data(conn):
     """Initializes the personnel table with some data."""
     cursor = conn.cursor()
 
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS personnel (
-            perNum INTEGER PRIMARY KEY,
-            name TEXT,
-            designation TEXT,
-            role TEXT check (role in ('HOD','Permanent',''))
-        );
-        """
-    )
-
     cursor.execute(
         """
         INSERT INTO personnel
@@ -92,21 +110,135 @@ def initialize_personnel_data(conn):
 def load_personnel_data():
     """Loads the personnel data from the database."""
     conn, db_was_just_created = connect_personnel_db()
-    conn.row_factory = sqlite3.Row
     if db_was_just_created:
         initialize_personnel_data(conn)
     return conn
 
 def connect_attendance_db():
-    """Connects to the sqlite database."""
+    """Returns the shared connection to the attendance database."""
+    return get_connection("attendance.db")
+
+
+# Read views of the attendance tables with name and designation joined from personnel.
+# Views in attendance.db cannot reference another database, so they are TEMP views
+# created on each connection that has personnel.db attached.
+PERSONNEL_VIEWS = {
+    "secretariat_view": """
+        SELECT s.perNum, p.name, p.designation
+        FROM main.secretariat s LEFT JOIN personnel.personnel p ON p.perNum = s.perNum
+    """,
+    "coremembers_view": """
+        SELECT c.perNum, p.name, p.designation, c.role
+        FROM main.coremembers c LEFT JOIN personnel.personnel p ON p.perNum = c.perNum
+    """,
+    "item_owners_view": """
+        SELECT o.perNum, p.name, p.designation, o.meeting_id, o.item_id
+        FROM main.item_owners o LEFT JOIN personnel.personnel p ON p.perNum = o.perNum
+    """,
+    "additional_attendees_view": """
+        SELECT a.perNum, p.name, p.designation, a.meeting_id, a.item_id
+        FROM main.additional_attendees a LEFT JOIN personnel.personnel p ON p.perNum = a.perNum
+    """,
+    "nonselect_attendance_view": """
+        SELECT n.perNum, p.name, p.designation, n.meeting_id, n.item_id, n.attendance_flag, n.role, n.remarks
+        FROM main.nonselect_attendance n LEFT JOIN personnel.personnel p ON p.perNum = n.perNum
+    """,
+}
+
+# Cached attendance reads also change when a person is renamed in personnel
+PERSONNEL_DEPENDENCY = [("personnel.db", ["personnel"])]
+
+
+def connect_attendance_with_personnel_db():
+    """Returns the attendance connection with personnel.db attached as schema personnel and the PERSONNEL_VIEWS created."""
+    conn = get_attached_connection("attendance.db", ["personnel.db"])
+    if conn.execute("SELECT 1 FROM temp.sqlite_master WHERE type = 'view' AND name = 'nonselect_attendance_view'").fetchone() is None:
+        for view, query in PERSONNEL_VIEWS.items():
+            conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {view} AS {query}")
+    return conn
+
+
+# Member tables filled from personnel, and the columns each stores besides perNum
+MEMBER_TABLE_COLUMNS = {
+    "secretariat": [],
+    "coremembers": ["role"],
+    "item_owners": ["meeting_id", "item_id"],
+    "additional_attendees": ["meeting_id", "item_id"],
+}
+
+
+def to_perNum_list(perNums):
+    """Splits a perNum or list of perNums into (valid integer perNums, invalid values)."""
+    if isinstance(perNums, (list, tuple, set)):
+        values = perNums
+    else:
+        values = [perNums]
+    valid, invalid = [], []
+    for value in values:
+        try:
+            valid.append(int(value))
+        except (TypeError, ValueError):
+            invalid.append(value)
+    return valid, invalid
+
+
+def upsert_members_from_personnel(cursor, table, members):
+    """
+    Inserts or replaces members of table, keeping only those found in personnel.
+
+    cursor must belong to connect_attendance_with_personnel_db(). Each member is a dict with
+    perNum and the table's MEMBER_TABLE_COLUMNS; the whole list is checked against personnel
+    in one INSERT ... SELECT.
+
+    Returns:
+        tuple: (rows written, perNums not found in personnel)
+    """
+    extra_columns = MEMBER_TABLE_COLUMNS[table]
+    columns = ", ".join(["perNum"] + extra_columns)
+    selected = ", ".join(["p.perNum"] + [f"json_extract(m.value, '$.{column}')" for column in extra_columns])
+    members_json = json.dumps(members)
+
+    cursor.execute(
+        f"""
+        INSERT OR REPLACE INTO {table} ({columns})
+        SELECT {selected}
+        FROM json_each(?) m
+        JOIN personnel.personnel p ON p.perNum = json_extract(m.value, '$.perNum')
+        """,
+        (members_json,),
+    )
+    written = cursor.rowcount
+    cursor.execute(
+        """
+        SELECT DISTINCT json_extract(m.value, '$.perNum')
+        FROM json_each(?) m
+        WHERE json_extract(m.value, '$.perNum') NOT IN (SELECT perNum FROM personnel.personnel)
+        """,
+        (members_json,),
+    )
+    missing = [row[0] for row in cursor.fetchall()]
+    return written, missing
+
 
-    DB_FILENAME = Path(__file__).parent.parent/ "database" / "attendance.db"
-    db_already_exists = DB_FILENAME.exists()
+def report_missing_perNums(perNums):
+    """Shows one warning listing every perNum that was skipped."""
+    if perNums:
+        st.warning(f"No personnel with perNum {', '.join(str(perNum) for perNum in perNums)}")
 
-    conn = sqlite3.connect(DB_FILENAME)
-    db_was_just_created = not db_already_exists
 
-    return conn, db_was_just_created
+def add_members(table, members, invalid=()):
+    """Writes members into table in one transaction and reports unknown perNums together."""
+    attendance_conn = connect_attendance_with_personnel_db()
+    try:
+        written, missing = upsert_members_from_personnel(attendance_conn.cursor(), table, members)
+        attendance_conn.commit()
+    except sqlite3.Error as e:
+        print(f"An error occurred while adding to {table}: {e}")
+        attendance_conn.rollback()
+        return 0
+    print(f"{written} row(s) inserted into {table}")
+    report_missing_perNums(list(invalid) + missing)
+    return written
 
 
 def initialize_secretariat_data(conn, personnel_conn):
@@ -114,63 +246,40 @@ def initialize_secretariat_data(conn, personnel_conn):
     secretariat_perNum_list = [54546, 70880, 96465, 48140, 49091]
     cursor = conn.cursor()
     personnel_cursor= personnel_conn.cursor()
-    personnel_query = "SELECT perNum, name, designation FROM personnel where perNum in (" + ', '.join(['?']*len(secretariat_perNum_list)) + ")" 
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS secretariat (
-            perNum INTEGER PRIMARY KEY,
-            name TEXT,
-            designation TEXT
-        );
-        """
-    )
+    personnel_query = "SELECT perNum FROM personnel where perNum in (" + ', '.join(['?']*len(secretariat_perNum_list)) + ")" 
 
     personnel_cursor.execute(personnel_query,secretariat_perNum_list)
     data = personnel_cursor.fetchall()      
     
-    for row in data:
-        perNum, name, designation = row
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO secretariat
-                (perNum, name, designation)
-            VALUES
-                (?,?,?);
-        """,
-        (perNum, name, designation)
-    )
+    cursor.executemany("INSERT OR REPLACE INTO secretariat (perNum) VALUES (?);", data)
     conn.commit()
 
 
 def load_secretariat_data(personnelConn):
     """Loads the secretariat data from the database."""
     conn, db_was_just_created = connect_attendance_db()
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
 
-    cursor.execute('PRAGMA table_info(secretariat)')
-    table_checker = cursor.fetchall()
-    if len(table_checker) == 0:
+    cursor.execute('SELECT 1 FROM secretariat LIMIT 1')
+    if cursor.fetchone() is None:
         initialize_secretariat_data(conn,personnelConn)
-    conn.close()
 
 
+@cached_until_changed("attendance.db", "secretariat", depends_on=PERSONNEL_DEPENDENCY)
 def fetch_secretariat_data():
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
+    attendance_conn = connect_attendance_with_personnel_db()
     attendance_cursor = attendance_conn.cursor()
-    query = "SELECT perNum as PerNum, name as Name, designation as Designation FROM secretariat;"
+    attendance_cursor.row_factory = row_factory_for(SecretariatMember)
+    query = "SELECT perNum as PerNum, name as Name, designation as Designation FROM secretariat_view;"
     rows = attendance_cursor.fetchall()
 
     try:
         attendance_cursor.execute(query)
-        rows = attendance_cursor.fetchall()
-        data = [dict(row) for row in rows]
+        data = attendance_cursor.fetchall()
     except:
         return None
     
-    attendance_conn.close()
     return data
 
 
@@ -179,523 +288,266 @@ def initialize_coremembers_data(conn, personnel_conn):
     coremembers_perNum_list = [32788, 81316, 95169, 28811, 93492, 41870, 59598, 48246, 87829, 45387, 14902, 10887, 25616, 30749, 8135, 18642, 71433, 93449, 10584, 32893, 69129, 81044, 48928]
     cursor = conn.cursor()
     personnel_cursor= personnel_conn.cursor()
-    personnel_query = "SELECT perNum, name, designation, role FROM personnel where perNum in (" + ', '.join(['?']*len(coremembers_perNum_list)) + ")" 
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS coremembers (
-            perNum INTEGER PRIMARY KEY,
-            name TEXT,
-            designation TEXT,
-            role TEXT check(role in ('HOD','Permanent'))
-        );
-        """
-    )
+    personnel_query = "SELECT perNum, role FROM personnel where perNum in (" + ', '.join(['?']*len(coremembers_perNum_list)) + ")" 
 
     personnel_cursor.execute(personnel_query,coremembers_perNum_list)
     data = personnel_cursor.fetchall()      
 
-    for row in data:
-        perNum, name, designation, role = row
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO coremembers
-                (perNum, name, designation, role)
-            VALUES
-                (?,?,?,?);
-        """,
-        (perNum, name, designation, role)
-    )
+    cursor.executemany("INSERT OR REPLACE INTO coremembers (perNum, role) VALUES (?,?);", data)
     conn.commit()
 
 
 def load_coremembers_data(personnelConn):
     """Loads the coremembers data from the database."""
     conn, db_was_just_created = connect_attendance_db()
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
-    cursor.execute('PRAGMA table_info(coremembers)')
-    table_checker = cursor.fetchall()
-    if len(table_checker) == 0:
+    cursor.row_factory = sqlite3.Row
+    cursor.execute('SELECT 1 FROM coremembers LIMIT 1')
+    if cursor.fetchone() is None:
         initialize_coremembers_data(conn,personnelConn)
-    conn.close()
 
 
+@cached_until_changed("attendance.db", "coremembers", depends_on=PERSONNEL_DEPENDENCY)
 def fetch_coremembers_data():
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
+    attendance_conn = connect_attendance_with_personnel_db()
     attendance_cursor = attendance_conn.cursor()
-    query = "SELECT perNum as PerNum, name as Name, designation as Designation, role as Role FROM coremembers ORDER BY role;"
+    attendance_cursor.row_factory = row_factory_for(CoreMember)
+    query = "SELECT perNum as PerNum, name as Name, designation as Designation, role as Role FROM coremembers_view ORDER BY role;"
     rows = attendance_cursor.fetchall()
 
     try:
         attendance_cursor.execute(query)
-        rows = attendance_cursor.fetchall()
-        data = [dict(row) for row in rows]
+        data = attendance_cursor.fetchall()
     except:
         return None
     
-    attendance_conn.close()
     return data
 
 
-def add_or_update_secretariat_table(perNum):
-    # Add member into secretariat table
-    if isinstance(perNum, int):
-        perNum = perNum
-    try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
-    
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    personnel_conn, personnel_db_was_just_created = connect_personnel_db()
-
-    attendance_cursor = attendance_conn.cursor()
-    personnel_cursor = personnel_conn.cursor()
+@cached_until_changed("attendance.db", "secretariat", depends_on=PERSONNEL_DEPENDENCY)
+def fetch_secretariat_df():
+    """Secretariat table for the data editors, rebuilt only when secretariat changes."""
+    return pd.DataFrame(fetch_secretariat_data(), columns=field_names(SecretariatMember))
 
-    attendance_cursor.execute(f"PRAGMA table_info(secretariat)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: secretariat not found in database!')
-        exit()
 
-    personnel_select_query = "SELECT perNum, name, designation FROM personnel WHERE perNum == ?"
-    personnel_cursor.execute(personnel_select_query,(perNum,))
-    data = personnel_cursor.fetchall()
+@cached_until_changed("attendance.db", "coremembers", depends_on=PERSONNEL_DEPENDENCY)
+def fetch_coremembers_df():
+    """Core members table for the data editors, rebuilt only when coremembers changes."""
+    return pd.DataFrame(fetch_coremembers_data(), columns=field_names(CoreMember))
 
-    if len(data)>0:
-        for row in data:
-            perNum, name, designation = row
-    else:
-        st.warning(f'No personnel with perNum {perNum}')
-        #exit()
 
-    insert_query = f"INSERT OR REPLACE INTO secretariat (perNum, name, designation) values (?,?,?)"
-    attendance_cursor.execute(insert_query, (perNum, name, designation))
-    
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) inserted into secretariat")   
-    attendance_conn.commit()
-    attendance_conn.close()
-    personnel_conn.close()
+def add_or_update_secretariat_table(perNums):
+    """Adds one or more perNums to secretariat, copying their details from personnel."""
+    perNums, invalid = to_perNum_list(perNums)
+    return add_members("secretariat", [{"perNum": perNum} for perNum in perNums], invalid)
 
 
 def update_secretariat_data(df, changes):
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
-    attendance_cursor = attendance_conn.cursor()
-
-    if changes["deleted_rows"]:
-        perNums = []
-        for i in changes["deleted_rows"]:
-            row_dict = df.iloc[i].to_dict()
-            perNums.append(row_dict["PerNum"])
-
-        for perNum in perNums:
-            remove_table_member("secretariat",perNum)
-    
-    if changes["added_rows"]:
-        perNums = []
-        
-        for i in changes["added_rows"]:
-            perNum =  i["PerNum"]
-            add_or_update_secretariat_table(perNum)
-
-    attendance_conn.commit()
-    attendance_conn.close()
-
-
-
-def add_or_update_coremembers_table(perNum, role):
-    # Add member into coremembers table
-    if isinstance(perNum, int):
-        perNum = perNum
-    try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
-    
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    personnel_conn, personnel_db_was_just_created = connect_personnel_db()
-
-    attendance_cursor = attendance_conn.cursor()
-    personnel_cursor = personnel_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info(coremembers)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: coremembers not found in database!')
-        exit()
-
-    personnel_select_query = "SELECT perNum, name, designation FROM personnel WHERE perNum == ?"
-    personnel_cursor.execute(personnel_select_query,(perNum,))
-    data = personnel_cursor.fetchall()
+    apply_membership_changes("secretariat", df, changes)
 
-    if len(data)>0:
-        for row in data:
-            perNum, name, designation = row
-    else:
-        st.warning(f'No personnel with perNum {perNum}')
-        #exit()
 
-    insert_query = f"INSERT OR REPLACE INTO coremembers (perNum, name, designation, role) values (?,?,?,?)"
-    attendance_cursor.execute(insert_query, (perNum, name, designation,role))
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) inserted into coremembers")   
-    attendance_conn.commit()
-    attendance_conn.close()
-    personnel_conn.close()
+def add_or_update_coremembers_table(perNums, role):
+    """Adds one or more perNums to coremembers with role, copying their details from personnel."""
+    perNums, invalid = to_perNum_list(perNums)
+    return add_members("coremembers", [{"perNum": perNum, "role": role} for perNum in perNums], invalid)
 
 
 def update_coremembers_data(df, changes):
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
-    attendance_cursor = attendance_conn.cursor()
-
-
-    if changes["edited_rows"]:
-        deltas = st.session_state.coremembers["edited_rows"]
-        rows = []
-        for i, delta in deltas.items():
-            row_dict = df.iloc[i].to_dict()
-            row_dict.update(delta)
-            rows.append(row_dict)
-
-        attendance_cursor.executemany(
-            """
-            UPDATE coremembers
-            SET
-                perNum = :PerNum,
-                role = :Role
-            WHERE perNum = :PerNum 
-            """,
-            rows,
-            )
-
-    if changes["deleted_rows"]:
-        perNums = []
-        for i in changes["deleted_rows"]:
-            row_dict = df.iloc[i].to_dict()
-            perNums.append(row_dict["PerNum"])
-
-        for perNum in perNums:
-            remove_table_member("coremembers",perNum)
-    
-    if changes["added_rows"]:
-        perNums = []
-        
-        for i in changes["added_rows"]:
-            perNum =  i["PerNum"]
-            role = i["Role"]
-            add_or_update_coremembers_table(perNum,role)
-
-    attendance_conn.commit()
-    attendance_conn.close()
-
-
-def remove_table_member(table, perNum):
-    # Remove member from secretariat or coremembers table
-    perNum = int(perNum)
-    if not type(perNum) is int:
-        raise TypeError('perNum needs to be integer!')
-    if not type(table) is str:
-        raise TypeError('table needs to be string!')
-
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_cursor = attendance_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info({table})")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print('No such table!')
-        exit()
-
-    delete_query = f"DELETE from {table} WHERE perNum == ?"
-    attendance_cursor.execute(delete_query, (perNum,))
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) deleted from {table}")
-    attendance_conn.commit()
-    attendance_conn.close()
-
-
-def initialize_item_owners_table(conn):
-    """Initializes the item_owners table."""
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS item_owners (
-            perNum INTEGER PRIMARY KEY,
-            name TEXT,
-            designation TEXT,
-            meeting_id NOT NULL,
-            item_id not NULL
-        );
-        """
-    )
-    conn.commit()
-    conn.close()
-
-
-def load_item_owners_table():
-    """Loads the item_owners table into the database."""
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
-    attendance_cursor = attendance_conn.cursor()
-
-    attendance_cursor.execute('PRAGMA table_info(item_owners)')
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        initialize_item_owners_table(attendance_conn)
-    attendance_conn.close()
- 
-
-
-def add_or_update_item_owners(meeting_id, item_id, perNum):
-    # Adding item owner into item_owners
-    if isinstance(perNum, int):
-        perNum = perNum
+    apply_membership_changes("coremembers", df, changes)
+
+
+# Member tables editable from the home page, and the data editor column holding each member's role
+MEMBERSHIP_ROLE_COLUMNS = {"secretariat": None, "coremembers": "Role"}
+
+
+def apply_membership_changes(table, df, changes):
+    """
+    Applies a data_editor change set of secretariat or coremembers in one transaction.
+
+    Deleted rows are removed, rows whose PerNum was edited replace the original member,
+    and added or edited members are checked against the attached personnel database
+    in one join. PerNums not found in personnel are reported together and skipped;
+    a member whose PerNum was edited to one of them is kept.
+
+    Returns:
+        dict: Counts of members removed and upserted, and the list of unknown perNums.
+    """
+    if table not in MEMBERSHIP_ROLE_COLUMNS:
+        raise ValueError(f"{table} is not a membership table")
+    role_column = MEMBERSHIP_ROLE_COLUMNS[table]
+
+    removals = set()
+    upserts = {}  # perNum -> role
+    replaced = {}  # edited perNum -> original perNum it replaces
+    invalid = []
+
+    def to_perNum(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            invalid.append(value)
+            return None
+
+    for i in changes.get("deleted_rows", []):
+        removals.add(int(df.iloc[i]["PerNum"]))
+
+    for i, delta in changes.get("edited_rows", {}).items():
+        original = df.iloc[int(i)].to_dict()
+        original_perNum = int(original["PerNum"])
+        perNum = to_perNum(delta.get("PerNum", original_perNum))
+        if perNum is None:
+            continue
+        if perNum != original_perNum:
+            replaced[perNum] = original_perNum
+        elif role_column is None or role_column not in delta:
+            continue
+        upserts[perNum] = delta.get(role_column, original.get(role_column)) if role_column else None
+
+    for row in changes.get("added_rows", []):
+        perNum = to_perNum(row.get("PerNum"))
+        if perNum is not None:
+            upserts[perNum] = row.get(role_column) if role_column else None
+
+    members = [
+        {"perNum": perNum, "role": role} if role_column else {"perNum": perNum}
+        for perNum, role in upserts.items()
+    ]
+    attendance_conn = connect_attendance_with_personnel_db()
     try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
-
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    personnel_conn, personnel_db_was_just_created = connect_personnel_db()
-
-    attendance_cursor = attendance_conn.cursor()
-    personnel_cursor = personnel_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info(item_owners)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: item_owners not found in database!')
-        exit()
-
-    personnel_select_query = "SELECT perNum, name, designation FROM personnel WHERE perNum == ?"
-    personnel_cursor.execute(personnel_select_query,(perNum,))
-    data = personnel_cursor.fetchall()
+        attendance_cursor = attendance_conn.cursor()
+        written, missing = upsert_members_from_personnel(attendance_cursor, table, members)
+        # An original member is only removed once its replacement was found in personnel
+        removals |= {original_perNum for perNum, original_perNum in replaced.items() if perNum not in missing}
+        attendance_cursor.executemany(f"DELETE FROM {table} WHERE perNum = ?", [(perNum,) for perNum in removals - set(upserts)])
+        removed = attendance_cursor.rowcount
+        attendance_conn.commit()
+    except sqlite3.Error as e:
+        print(f"An error occurred while updating {table}: {e}")
+        attendance_conn.rollback()
+        return None
 
-    if len(data)>0:
-        for row in data:
-            perNum, name, designation = row
-    else:
-        st.warning(f'No personnel with perNum {perNum}')
-#        exit()
+    print(f"{removed} row(s) deleted from {table}, {written} row(s) inserted or updated")
+    report_missing_perNums(invalid + missing)
+    return {"removed": removed, "upserted": written, "missing": invalid + missing}
 
-    insert_query = f"INSERT OR REPLACE INTO item_owners (perNum, name, designation,meeting_id, item_id) values (?,?,?,?,?)"
-    attendance_cursor.execute(insert_query, (perNum, name, designation,meeting_id, item_id))
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) inserted into item_owners")   
-    attendance_conn.commit()
-    attendance_conn.close()
-    personnel_conn.close()
 
+def remove_table_member(table, perNums):
+    """Removes one or more perNums from secretariat or coremembers."""
+    if table not in MEMBERSHIP_ROLE_COLUMNS:
+        raise ValueError(f"{table} is not a membership table")
+    perNums, invalid = to_perNum_list(perNums)
+    return remove_members(table, "perNum = ?", [(perNum,) for perNum in perNums], invalid)
 
-def remove_item_owners(meeting_id, item_id, perNum):
-    # Removing an item owner from item_owners
-    if isinstance(perNum, int):
-        perNum = perNum
-    try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
 
+def remove_members(table, condition, params, invalid=()):
+    """Deletes the rows of table matching condition for every parameter tuple, in one transaction."""
     attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_cursor = attendance_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info(item_owners)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: item_owners not found in database!')
-        exit()
-
-    delete_query = f"DELETE from item_owners WHERE perNum == ? and meeting_id== ? and item_id == ?"
-    attendance_cursor.execute(delete_query, (perNum, meeting_id, item_id,))
+    try:
+        attendance_cursor = attendance_conn.cursor()
+        attendance_cursor.executemany(f"DELETE FROM {table} WHERE {condition}", params)
+        attendance_conn.commit()
+    except sqlite3.Error as e:
+        print(f"An error occurred while removing from {table}: {e}")
+        attendance_conn.rollback()
+        return 0
     result = attendance_cursor.rowcount
-    print(f"{result} row(s) deleted from item_owners")   
-    attendance_conn.commit()
-    attendance_conn.close()
-
-
-def initialize_additional_attendees_table(conn):
-    """Initializes the non-select attendance table."""
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS additional_attendees (
-            perNum INTEGER,
-            name TEXT,
-            designation TEXT,
-            meeting_id NOT NULL,
-            item_id not NULL
-        );
-        """
-    )
-    conn.commit()
-    conn.close()
+    print(f"{result} row(s) deleted from {table}")
+    report_missing_perNums(list(invalid))
+    return result
 
 
-def load_additional_attendees_table():
-    """Loads the additional attendees into the database."""
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
-    attendance_cursor = attendance_conn.cursor()
+def add_or_update_item_owners(meeting_id, item_id, perNums):
+    """Adds one or more item owners of item_id, copying their details from personnel."""
+    perNums, invalid = to_perNum_list(perNums)
+    members = [{"perNum": perNum, "meeting_id": int(meeting_id), "item_id": int(item_id)} for perNum in perNums]
+    return add_members("item_owners", members, invalid)
 
-    attendance_cursor.execute('PRAGMA table_info(additional_attendees)')
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        initialize_additional_attendees_table(attendance_conn)
-    attendance_conn.close()
 
+def remove_item_owners(meeting_id, item_id, perNums):
+    """Removes one or more item owners of item_id."""
+    perNums, invalid = to_perNum_list(perNums)
+    params = [(perNum, meeting_id, item_id) for perNum in perNums]
+    return remove_members("item_owners", "perNum = ? AND meeting_id = ? AND item_id = ?", params, invalid)
 
 
-def add_additional_attendees(meeting_id, item_id, perNum):
+def add_additional_attendees(meeting_id, item_id, perNums):
     """ Adds additional attendees into additional_attendees table"""
-    if isinstance(perNum, int):
-        perNum = perNum
-    try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
-
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    personnel_conn, personnel_db_was_just_created = connect_personnel_db()
-
-    attendance_cursor = attendance_conn.cursor()
-    personnel_cursor = personnel_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info(additional_attendees)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: additional_attendees not found in database!')
-        exit()
-
-    personnel_select_query = "SELECT perNum, name, designation FROM personnel WHERE perNum == ?"
-    personnel_cursor.execute(personnel_select_query,(perNum,))
-    data = personnel_cursor.fetchall()
-
-    if len(data)>0:
-        for row in data:
-            perNum, name, designation = row
-    else:
-        st.warning(f'No personnel with perNum {perNum}')
-        #exit()
-
-    insert_query = f"INSERT OR REPLACE INTO additional_attendees (perNum, name, designation,meeting_id, item_id) values (?,?,?,?,?)"
-    attendance_cursor.execute(insert_query, (perNum, name, designation,meeting_id, item_id))
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) inserted into additional_attendees")   
-    attendance_conn.commit()
-    attendance_conn.close()
-    personnel_conn.close()
+    perNums, invalid = to_perNum_list(perNums)
+    members = [{"perNum": perNum, "meeting_id": int(meeting_id), "item_id": int(item_id)} for perNum in perNums]
+    return add_members("additional_attendees", members, invalid)
 
 
-def remove_additional_attendees(meeting_id, item_id, perNum):
+def remove_additional_attendees(meeting_id, item_id, perNums):
     """ Removing additional attendees from additional_attendees table"""
-    if isinstance(perNum, int):
-        perNum = perNum
-    try:
-        perNum = int(perNum)    
-    except ValueError:    
-        print('perNum needs to be integer!')
-        exit()
-
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_cursor = attendance_conn.cursor()
-
-    attendance_cursor.execute(f"PRAGMA table_info(additional_attendees)")
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        print(f'Table: additional_attendees not found in database!')
-        exit()
-
-    delete_query = f"DELETE from additional_attendees WHERE perNum == ? and meeting_id== ? and item_id == ?"
-    attendance_cursor.execute(delete_query, (perNum, meeting_id, item_id,))
-    result = attendance_cursor.rowcount
-    print(f"{result} row(s) deleted from additional_attendees")   
-    attendance_conn.commit()
-    attendance_conn.close()
-
-
-def initialize_nonselect_attendance_table(conn):
-    """Initializes the non-select attendance table."""
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS nonselect_attendance (
-            perNum INTEGER,
-            name TEXT,
-            designation TEXT,
-            meeting_id INTEGER NOT NULL,
-            item_id INTEGER NOT NULL,
-            attendance_flag BOOLEAN NOT NULL ,
-            role TEXT CHECK(role in ('HOD', 'Permanent', 'Secretariat', 'ItemOwner', 'AdditionalAttendee', 'DesignateReplacement')),
-            remarks TEXT
-        );
-        """
-    )
-    conn.commit()
-    conn.close()
-
-
-def load_nonselect_attendance_table():
-    """Loads the nonselect attendance table into the database."""
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
-    attendance_cursor = attendance_conn.cursor()
-
-    attendance_cursor.execute('PRAGMA table_info(nonselect_attendance)')
-    table_checker = attendance_cursor.fetchall()
-    if len(table_checker) == 0:
-        initialize_nonselect_attendance_table(attendance_conn)
-    attendance_conn.close() 
+    perNums, invalid = to_perNum_list(perNums)
+    params = [(perNum, meeting_id, item_id) for perNum in perNums]
+    return remove_members("additional_attendees", "perNum = ? AND meeting_id = ? AND item_id = ?", params, invalid)
 
 
 def default_nonselect_attendance_for_meetingid(meeting_id, item_id_list):
-    """ Populating the default non-select attendance for meeting_id and all item_ids with 'Y'"""
+    """
+    Populating the default non-select attendance for meeting_id and all item_ids with 'Y'
+
+    Core members and secretariat are added to every item in item_id_list, item owners and
+    additional attendees to their own items. A person listed in several rosters for the same
+    item gets one row, with the first matching role in that order. Re-running it refreshes
+    roles but keeps recorded attendance and remarks.
+    """
     attendance_conn, attendance_db_was_just_created = connect_attendance_db()
     attendance_cursor = attendance_conn.cursor()
-    for item_id in item_id_list:
-        coremembers_query = f"INSERT INTO nonselect_attendance SELECT perNum, name, designation, {meeting_id}, {item_id}, TRUE, role, '' from coremembers;"
-        attendance_cursor.execute(coremembers_query)
-        secretariat_query = f"INSERT INTO nonselect_attendance SELECT perNum, name, designation, {meeting_id}, {item_id},TRUE, 'Secretariat', '' from secretariat;"
-        attendance_cursor.execute(secretariat_query)
-    item_owner_query = f"INSERT INTO nonselect_attendance SELECT perNum, name, designation, meeting_id, item_id, TRUE, 'ItemOwner', '' from item_owners where meeting_id == ?;"
-    attendance_cursor.execute(item_owner_query, (meeting_id,))
-    additional_attendees_query = f"INSERT INTO nonselect_attendance SELECT perNum, name, designation, meeting_id, item_id, TRUE, 'AdditionalAttendee', '' from additional_attendees where meeting_id == ?;"
-    attendance_cursor.execute(additional_attendees_query, (meeting_id,))
-    attendance_conn.commit()
-    attendance_conn.close()
+    query = """
+    WITH roster AS (
+        SELECT c.perNum, items.value AS item_id, c.role, 1 AS priority
+        FROM coremembers c CROSS JOIN json_each(:item_ids) items
+        UNION ALL
+        SELECT s.perNum, items.value, 'Secretariat', 2
+        FROM secretariat s CROSS JOIN json_each(:item_ids) items
+        UNION ALL
+        SELECT perNum, CAST(item_id AS INTEGER), 'ItemOwner', 3
+        FROM item_owners WHERE meeting_id = :meeting_id
+        UNION ALL
+        SELECT perNum, CAST(item_id AS INTEGER), 'AdditionalAttendee', 4
+        FROM additional_attendees WHERE meeting_id = :meeting_id
+    ),
+    ranked AS (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY item_id, perNum ORDER BY priority) AS rank
+        FROM roster
+    )
+    INSERT INTO nonselect_attendance (perNum, meeting_id, item_id, attendance_flag, role, remarks)
+    SELECT perNum, :meeting_id, item_id, TRUE, role, ''
+    FROM ranked
+    WHERE rank = 1
+    ON CONFLICT (meeting_id, item_id, perNum) DO UPDATE SET role = excluded.role
+    """
+    try:
+        attendance_cursor.execute(query, {"meeting_id": int(meeting_id), "item_ids": json.dumps([int(item_id) for item_id in item_id_list])})
+        attendance_conn.commit()
+    except sqlite3.Error as e:
+        print(f"An error occurred while populating the default attendance: {e}")
+        attendance_conn.rollback()
 
 
+@cached_until_changed("attendance.db", "nonselect_attendance", depends_on=PERSONNEL_DEPENDENCY)
 def fetch_nonselect_attendance_by_meetingid(meeting_id):
-    attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
+    attendance_conn = connect_attendance_with_personnel_db()
     attendance_cursor = attendance_conn.cursor()
-    query = "SELECT perNum as PerNum, name as Name, designation as Designation, meeting_id as MeetingId, item_id as ItemID, attendance_flag as Attendance, role as Role, remarks as Remarks FROM nonselect_attendance WHERE meeting_id = ? order by perNum"
+    attendance_cursor.row_factory = row_factory_for(AttendanceRecord)
+    query = "SELECT perNum as PerNum, name as Name, designation as Designation, meeting_id as MeetingId, item_id as ItemID, attendance_flag as Attendance, role as Role, remarks as Remarks FROM nonselect_attendance_view WHERE meeting_id = ? order by perNum"
     rows = attendance_cursor.fetchall()
 
     try:
         attendance_cursor.execute(query, (meeting_id,))
-        rows = attendance_cursor.fetchall()
-        data = [dict(row) for row in rows]
+        data = attendance_cursor.fetchall()
     except:
         return None
     
-    attendance_conn.close()
     return data
 
 
 def update_nonselect_attendance_by_meetingid(df, changes, meeting_id):
     attendance_conn, attendance_db_was_just_created = connect_attendance_db()
-    attendance_conn.row_factory = sqlite3.Row
     attendance_cursor = attendance_conn.cursor()
+    attendance_cursor.row_factory = sqlite3.Row
 
     if changes["edited_rows"]:
         deltas = st.session_state.nonselect_attendance["edited_rows"]
@@ -729,4 +581,3 @@ def update_nonselect_attendance_by_meetingid(df, changes, meeting_id):
             rows,)
 
     attendance_conn.commit()
-    attendance_conn.close()
@@ -1,13 +1,14 @@
 import streamlit as st
-from collections import defaultdict
-from pathlib import Path
 import sqlite3
-import pandas as pd
 from dataclasses import dataclass
-from utils.constants import Purpose_Lookup
-
-@dataclass
-class MeetingItem:
+from utils.constants import Item_Status, Purpose_Lookup
+from backend.database.connectionManager import get_connection
+from backend.database.changeTracker import cached_until_changed
+from backend.database.rowModels import RowModel, field_names, row_factory_for
+from backend.database.changeSets import apply_change_set
+
+@dataclass(slots=True)
+class MeetingItem(RowModel):
     id: int
     meetingId: int
     title: str
@@ -21,48 +22,13 @@ class MeetingItem:
     additionalAttendees: str
     createdBy: str
     createdOn: int
-    itemOrder: int
+    itemOrder: float
 
 def connect_item_db():
-    """Connects to the sqlite database."""
-
-    DB_FILENAME = Path(__file__).parent.parent / "database" / "item.db"
-    db_already_exists = DB_FILENAME.exists()
-
-    conn = sqlite3.connect(DB_FILENAME)
-    db_was_just_created = not db_already_exists
-    if db_was_just_created:
-        initialize_item_table(conn)
-
+    """Returns the shared connection to the item database."""
+    conn, _ = get_connection("item.db")
     return conn
 
-def initialize_item_table(conn):
-    """Initializes the item table with dummy data."""
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS Item (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meetingId INTEGER NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            purpose TEXT,
-            tier INTEGER,
-            selectFlag INTEGER,
-            duration INTEGER,
-            itemOwner TEXT,
-            additionalAttendees TEXT,
-            status TEXT,
-            createdBy TEXT,
-            createdOn INTEGER,
-            itemOrder INTEGER,
-        )
-        """
-    )
-    conn.commit()
-
-
 # Create item
 def create_item(item_data):
     """
@@ -104,16 +70,14 @@ def create_item(item_data):
     return item_data
 
 # Read items by meetingId
+@cached_until_changed("item.db", "Item")
 def read_items(meeting_id):
     query = "SELECT * FROM Item WHERE meetingId = ?"
     
-    with connect_item_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, (meeting_id,))
-        rows = cursor.fetchall()
-        # Convert rows to list of dictionaries
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+    cursor = connect_item_db().cursor()
+    cursor.row_factory = row_factory_for(MeetingItem)
+    cursor.execute(query, (meeting_id,))
+    return cursor.fetchall()
 
 # Update item by id
 def update_item(item_id, updated_data):
@@ -142,117 +106,171 @@ def update_item(item_id, updated_data):
     except sqlite3.Error as e:
         print(f"An error occurred while updating the item: {e}")
 
-    conn.close()
     return get_item_by_id(item_id)
 
-def update_agenda_table_data(styler_df, changes):
-    df = styler_df.data
-    conn = connect_item_db()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    if changes["edited_rows"]:
-        deltas = st.session_state.tier1_agenda_editor["edited_rows"]
-        rows = []
-        for i, delta in deltas.items():
-            row_dict = df.iloc[i].to_dict()
-            row_dict.update(delta)
-            rows.append(row_dict)
-
-        cursor.executemany(
-            """
-            UPDATE item
-            SET
-                itemOrder = :itemOrder,
-                duration = :duration,
-                status = :status
-            WHERE id = :id
-            """,
-            rows,
-            )
-
-    if changes["deleted_rows"]:
-        cursor.executemany(
-            "DELETE FROM item WHERE id = :id",
-            ({"id": int(df.loc[i, "id"])} for i in changes["deleted_rows"]),
-        )
+# Rejected and waitlisted items take up none of their meeting's time
+NO_CAPACITY_STATUSES = (Item_Status.REJECTED.value, Item_Status.WAITLIST.value, Item_Status.WAITLISTED.value)
 
-    
-    if changes["added_rows"]:
-        cursor.executemany(
-            """
-            INSERT INTO item
-                    (meetingId, title, description, purpose, tier, selectFlag, duration, itemOwner, additionalAttendees, status, createdBy, createdOn, itemOrder)
-            VALUES
-                (:meetingId, :title, :description, :purpose, :tier, :selectFlag, :duration, :itemOwner, :additionalAttendees, :status, :createdBy, :createdOn, :itemOrder)
-            """,
-            (defaultdict(lambda: None, row) for row in changes["added_rows"]),
-        )
+def occupies_capacity(status):
+    """True if an item with this status takes up time in its meeting."""
+    return status not in NO_CAPACITY_STATUSES
+
+def occupies_capacity_sql(column="status"):
+    """Returns (condition, params), occupies_capacity as an SQL condition on column."""
+    placeholders = ", ".join("?" * len(NO_CAPACITY_STATUSES))
+    return f"IFNULL({column}, '') NOT IN ({placeholders})", NO_CAPACITY_STATUSES
+
+# Columns the secretariat can change from the agenda editors
+AGENDA_EDITABLE_COLUMNS = ["itemOrder", "duration", "status"]
+STATUS_EDITABLE_COLUMNS = ["status"]
+ITEM_INSERT_COLUMNS = [name for name in field_names(MeetingItem) if name != "id"]
 
+def apply_item_table_changes(styler_df, changes, editable_columns):
+    """
+    Writes an agenda data_editor change set to the Item table in one transaction.
+
+    Only the edited cells in editable_columns are written; see apply_change_set.
+
+    Returns:
+        list: The edited and added items as stored, or None if nothing was written.
+    """
+    try:
+        rows = apply_change_set(
+            connect_item_db(), "Item", styler_df, changes, editable_columns, insertable_columns=ITEM_INSERT_COLUMNS
+        )
+    except sqlite3.Error as e:
+        print(f"An error occurred while updating items: {e}")
+        st.error("Items could not be updated, no changes were saved.")
+        return None
     st.toast("Item successfully updated")
-    conn.commit()
-    conn.close()
+    return rows
 
-def update_status_table_data(styler_df, changes):
-    df = styler_df.data
+ORDER_KEY_STEP = 1.0  # Gap between neighbouring order keys after a rebalance
+MIN_ORDER_KEY_GAP = 1e-9  # Closer neighbours than this make the agenda's keys get spread out again
+
+def order_keys_between(before, after, count):
+    """
+    Returns count increasing order keys strictly between two neighbouring keys, or None if they do not fit.
+
+    before and after are None at the start and end of the agenda. Presented items have
+    keys above 0, an itemOrder of 0 means the item is not presented.
+    """
+    low = 0.0 if before is None else before
+    if after is None:
+        return [low + ORDER_KEY_STEP * k for k in range(1, count + 1)]
+    step = (after - low) / (count + 1)
+    if step < MIN_ORDER_KEY_GAP:
+        return None
+    return [low + step * k for k in range(1, count + 1)]
+
+def plan_item_order(ordered_keys, positions):
+    """
+    Returns {item_id: new itemOrder} that places items at new positions in an agenda.
+
+    itemOrder is a fractional key: a moved item gets a key between its new neighbours,
+    so only moved items are written. When neighbouring keys get too close, every
+    presented item is given evenly spaced keys again.
+
+    Parameters:
+        ordered_keys (list): (item_id, itemOrder) of the presented items, in agenda order.
+        positions (dict): item_id -> 1-based position in the agenda, 0 to stop presenting it.
+    """
+    keys = dict(ordered_keys)
+    order = [item_id for item_id, _ in ordered_keys if item_id not in positions]
+    for item_id, position in sorted(positions.items(), key=lambda move: move[1]):
+        if position > 0:
+            order.insert(min(position - 1, len(order)), item_id)
+
+    new_keys = {item_id: 0 for item_id, position in positions.items() if position <= 0}
+    moved_run = []  # Consecutive moved items waiting for the next unmoved neighbour
+    before = None
+    for item_id in order + [None]:
+        if item_id in positions:
+            moved_run.append(item_id)
+            continue
+        if moved_run:
+            run_keys = order_keys_between(before, None if item_id is None else keys[item_id], len(moved_run))
+            if run_keys is None:
+                rebalanced = {item_id: ORDER_KEY_STEP * position for position, item_id in enumerate(order, start=1)}
+                new_keys.update((item_id, key) for item_id, key in rebalanced.items() if keys.get(item_id) != key)
+                return new_keys
+            new_keys.update(zip(moved_run, run_keys))
+            moved_run = []
+        if item_id is not None:
+            before = keys[item_id]
+    return new_keys
+
+def get_agenda_order_keys(item_id):
+    """Returns (id, itemOrder) of the presented items in item_id's meeting and tier, in agenda order."""
+    cursor = connect_item_db().execute(
+        """
+        SELECT agenda.id, agenda.itemOrder
+        FROM Item moved
+        JOIN Item agenda ON agenda.meetingId = moved.meetingId AND agenda.tier = moved.tier
+        WHERE moved.id = ?
+        AND agenda.itemOrder > 0
+        ORDER BY agenda.itemOrder, agenda.purpose IS NULL, agenda.purpose, agenda.id
+        """,
+        (item_id,),
+    )
+    return cursor.fetchall()
+
+def move_item(item_id, position):
+    """
+    Moves an item to a 1-based position in its agenda, or off it with position 0.
+
+    Usually only the moved item is written.
+
+    Returns:
+        float: The item's new itemOrder, or None if the move failed.
+    """
     conn = connect_item_db()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    if changes["edited_rows"]:
-        deltas = st.session_state.tier2_agenda_editor["edited_rows"]
-        rows = []
-        for i, delta in deltas.items():
-            row_dict = df.iloc[i].to_dict()
-            row_dict.update(delta)
-            rows.append(row_dict)
-
-        cursor.executemany(
-            """
-            UPDATE item
-            SET
-                status = :status
-            WHERE id = :id
-            """,
-            rows,
-            )
-
-    if changes["deleted_rows"]:
-        cursor.executemany(
-            "DELETE FROM item WHERE id = :id",
-            ({"id": int(df.loc[i, "id"])} for i in changes["deleted_rows"]),
-        )
+    try:
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        new_keys = plan_item_order(get_agenda_order_keys(item_id), {item_id: position})
+        conn.executemany("UPDATE Item SET itemOrder = ? WHERE id = ?", [(key, moved_id) for moved_id, key in new_keys.items()])
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"An error occurred while moving item {item_id}: {e}")
+        return None
+    return new_keys[item_id]
 
-    
-    if changes["added_rows"]:
-        cursor.executemany(
-            """
-            INSERT INTO item
-                    (meetingId, title, description, purpose, tier, selectFlag, duration, itemOwner, additionalAttendees, status, createdBy, createdOn, itemOrder)
-            VALUES
-                (:meetingId, :title, :description, :purpose, :tier, :selectFlag, :duration, :itemOwner, :additionalAttendees, :status, :createdBy, :createdOn, :itemOrder)
-            """,
-            (defaultdict(lambda: None, row) for row in changes["added_rows"]),
-        )
+def update_agenda_table_data(styler_df, changes):
+    """
+    Saves the tier 1 agenda editor. The Order column shows positions, which are turned into order keys.
+    """
+    df = styler_df.data
+    edited_rows = {int(i): dict(delta) for i, delta in changes.get("edited_rows", {}).items()}
+    positions = {
+        int(df.iloc[i]["id"]): int(delta.pop("itemOrder"))
+        for i, delta in edited_rows.items()
+        if "itemOrder" in delta
+    }
+    if positions:
+        row_by_id = {int(item_id): i for i, item_id in enumerate(df["id"])}
+        new_keys = plan_item_order(get_agenda_order_keys(next(iter(positions))), positions)
+        for item_id, key in new_keys.items():
+            if item_id in row_by_id:
+                edited_rows.setdefault(row_by_id[item_id], {})["itemOrder"] = key
+        changes = {**changes, "edited_rows": edited_rows}
+    return apply_item_table_changes(styler_df, changes, AGENDA_EDITABLE_COLUMNS)
 
-    st.toast("Item successfully updated")
-    conn.commit()
-    conn.close()
+def update_status_table_data(styler_df, changes):
+    return apply_item_table_changes(styler_df, changes, STATUS_EDITABLE_COLUMNS)
 
 
 
 # Helper function to fetch a single item by ID
+@cached_until_changed("item.db", "Item")
 def get_item_by_id(item_id):
     query = "SELECT * FROM Item WHERE id = ?"
     
-    with connect_item_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, (item_id,))
-        row = cursor.fetchone()
-        if row:
-            columns = [col[0] for col in cursor.description]
-            return dict(zip(columns, row))
-    return None
+    cursor = connect_item_db().cursor()
+    cursor.row_factory = row_factory_for(MeetingItem)
+    cursor.execute(query, (item_id,))
+    return cursor.fetchone()
 
 # Delete item by id
 def delete_item(item_id):
@@ -270,48 +288,36 @@ def delete_item(item_id):
     return item
 
 # Retrieve items by meeting_id and sort them by purpose
+@cached_until_changed("item.db", "Item")
 def get_sorted_items_by_id(meeting_id):
     query = """
     SELECT * FROM Item
     WHERE meetingId = ?
-    """    
-    with connect_item_db() as conn:
-        df = pd.read_sql_query(query, conn, params=(meeting_id,))
-        
-    if df.empty:
-        return []
-    
-    sorted_df = df.sort_values(
-            ['purpose'], 
-            ascending=[True],
-            na_position='last'
-        )
-    
-    return sorted_df.to_dict(orient="records")
+    ORDER BY purpose NULLS LAST, id
+    """
+    cursor = connect_item_db().cursor()
+    cursor.row_factory = row_factory_for(MeetingItem)
+    cursor.execute(query, (meeting_id,))
+    return cursor.fetchall()
 
-# Retrieve items by meeting_id and sort them by purpose
+# Retrieve items by meeting_id and tier, in agenda order then by purpose
+@cached_until_changed("item.db", "Item")
 def get_items_by_id_and_tier(meeting_id, tier):
+    # Read in order straight from idx_item_meeting_tier_order_purpose, items not presented (itemOrder 0) first.
+    # "purpose IS NULL, purpose" sorts missing purposes last like NULLS LAST, but matches the index.
     query = """
     SELECT * FROM Item
     WHERE meetingId = ?
     AND tier = ?
+    ORDER BY itemOrder, purpose IS NULL, purpose, id
     """
-
-    with connect_item_db() as conn:
-        df = pd.read_sql_query(query, conn, params=(meeting_id,tier,))
-        
-    if df.empty:
-        return []
-    
-    sorted_df = df.sort_values(
-            ['itemOrder', 'purpose'], 
-            ascending=[True, True],
-            na_position='last'
-        )
-    
-    return sorted_df.to_dict(orient="records")
+    cursor = connect_item_db().cursor()
+    cursor.row_factory = row_factory_for(MeetingItem)
+    cursor.execute(query, (meeting_id, tier))
+    return cursor.fetchall()
 
 
+@cached_until_changed("item.db", "Item")
 def get_total_duration(meeting_id: int) -> int:
     """
     Returns the total duration of all items for a given meeting ID.
@@ -1,12 +1,18 @@
-from pathlib import Path
 import sqlite3
 # from collections import defaultdict
 # import pandas as pd
 from dataclasses import dataclass
+from datetime import datetime, timezone
 import streamlit as st
-
-@dataclass
-class Meeting:
+from backend.database.connectionManager import get_connection, get_attached_connection
+from backend.database.changeTracker import cached_until_changed
+from backend.database.rowModels import RowModel, row_factory_for
+from backend.controller.itemController import MeetingItem
+from backend.controller.attachmentsController import Attachment
+from backend.controller.attendanceController import AttendanceRecord
+
+@dataclass(slots=True)
+class Meeting(RowModel):
     id: int
     meetingTitle: str
     meetingDate: str
@@ -22,41 +28,14 @@ class Meeting:
     status: str
 
 def connect_meeting_db():
-    """Connects to the sqlite database."""
-
-    DB_FILENAME = Path(__file__).parent.parent / "database" / "meeting.db"
-    db_already_exists = DB_FILENAME.exists()
-
-    conn = sqlite3.connect(DB_FILENAME)
-    db_was_just_created = not db_already_exists
-
-    return conn, db_was_just_created
+    """Returns the shared connection to the meeting database."""
+    return get_connection("meeting.db")
 
 
 def initialize_meeting_data(conn):
     """Initializes the meeting table with dummy data."""
     cursor = conn.cursor()
 
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS meeting (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            meetingTitle TEXT,
-            meetingDate TEXT,
-            description TEXT,
-            startTime TEXT,
-            endTime TEXT,
-            totalDuration INTEGER,
-            minutesLeft INTEGER,
-            minutesTaken INTEGER,
-            location TEXT,
-            createdBy TEXT,
-            createdOn INTEGER,
-            status TEXT
-        )
-        """
-    )
-
     cursor.execute(
         """
         INSERT INTO meeting
@@ -73,84 +52,276 @@ def initialize_meeting_data(conn):
     conn.commit()
 
 
+def current_date():
+    """Today's date as DATE('now') would return it, used to key cached meeting lists."""
+    return datetime.now(timezone.utc).date().isoformat()
+
+
 def load_meeting_data():
+    # Seed a new database before the cache reads its table versions, which opens it
     conn, db_was_just_created = connect_meeting_db()
-    conn.row_factory = sqlite3.Row
     if db_was_just_created:
         initialize_meeting_data(conn)
+    return _load_meeting_data(current_date())
+
+@cached_until_changed("meeting.db", "meeting")
+def _load_meeting_data(today):
+    conn, _ = connect_meeting_db()
 
     """Loads the meeting data from the database."""
     cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
 
     query = """
     SELECT *
     FROM meeting
-    WHERE meetingDate >= DATE('now')
+    WHERE meetingDate >= ?
     ORDER BY meetingDate ASC, startTime ASC
     """
 
     try:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        cursor.execute(query, (today,))
+        data = cursor.fetchall()
     except:
         return None
-    
-    conn.close()
+
     return data
 
 def load_past_meeting_data():
+    return _load_past_meeting_data(current_date())
+
+@cached_until_changed("meeting.db", "meeting")
+def _load_past_meeting_data(today):
     conn, _ = connect_meeting_db()
-    conn.row_factory = sqlite3.Row
 
     """Loads the meeting data from the database."""
     cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
 
     query = """
     SELECT *
     FROM meeting
-    WHERE meetingDate < DATE('now')
+    WHERE meetingDate < ?
     ORDER BY meetingDate ASC, startTime ASC
     """
 
     try:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        cursor.execute(query, (today,))
+        data = cursor.fetchall()
     except:
         return None
-    
-    conn.close()
+
     return data
 
+HISTORY_PAGE_SIZE = 20
+
+def load_meeting_history_page(after=None, page_size=HISTORY_PAGE_SIZE, status=None, location=None, date_from=None, date_to=None):
+    """
+    Returns one page of past meetings, newest first.
+
+    Pages are found with a keyset cursor on (meetingDate, startTime, id) rather than
+    OFFSET, so every page costs the same however long the history is.
+
+    Parameters:
+        after (tuple): next_cursor of the previous page, or None for the first page.
+        status (str): Only meetings with this status.
+        location (str): Only meetings whose location contains this text.
+        date_from, date_to (str): Inclusive YYYY-MM-DD bounds on meetingDate.
+
+    Returns:
+        tuple: (list of Meeting, next_cursor), next_cursor being None on the last page.
+    """
+    return _load_meeting_history_page(current_date(), tuple(after) if after else None, page_size, status, location, date_from, date_to)
+
+def meeting_history_query(today, after=None, page_size=HISTORY_PAGE_SIZE, status=None, location=None, date_from=None, date_to=None):
+    """
+    Returns (sql, params) selecting one page of meeting history, see load_meeting_history_page.
+
+    Past the first page, the cursor's meetingDate is also bound as the upper end of
+    the meetingDate range, so the index seeks straight to the cursor instead of
+    walking every newer meeting before the row-value comparison skips it.
+    """
+    # The tightest upper bound on meetingDate: before today, up to the cursor, up to date_to
+    upper_bound, upper_operator = today, "<"
+    for bound in (after[0] if after else None, date_to):
+        if bound is not None and bound < upper_bound:
+            upper_bound, upper_operator = bound, "<="
+
+    conditions = [f"meetingDate {upper_operator} ?"]
+    params = [upper_bound]
+    if after is not None:
+        conditions.append("(meetingDate, startTime, id) < (?, ?, ?)")
+        params.extend(after)
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if location:
+        conditions.append("location LIKE ?")
+        params.append(f"%{location}%")
+    if date_from:
+        conditions.append("meetingDate >= ?")
+        params.append(date_from)
+
+    # One extra row tells whether another page follows
+    sql = f"""
+        SELECT *
+        FROM meeting
+        WHERE {" AND ".join(conditions)}
+        ORDER BY meetingDate DESC, startTime DESC, id DESC
+        LIMIT ?
+    """
+    return sql, (*params, page_size + 1)
+
+@cached_until_changed("meeting.db", "meeting")
+def _load_meeting_history_page(today, after, page_size, status, location, date_from, date_to):
+    sql, params = meeting_history_query(today, after, page_size, status, location, date_from, date_to)
+    conn, _ = connect_meeting_db()
+    cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
+    cursor.execute(sql, params)
+    meetings = cursor.fetchall()
+
+    if len(meetings) <= page_size:
+        return meetings, None
+    meetings = meetings[:page_size]
+    last = meetings[-1]
+    return meetings, (last.meetingDate, last.startTime, last.id)
+
 # Function to fetch a specific meeting by ID
 def fetch_meeting_by_id(meeting_id):
+    try:
+        meeting_id = int(meeting_id)
+    except (TypeError, ValueError):
+        return None
+    return _fetch_meeting_by_id(meeting_id)
+
+@cached_until_changed("meeting.db", "meeting")
+def _fetch_meeting_by_id(meeting_id):
     conn, _ = connect_meeting_db()
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
     cursor.execute("SELECT * FROM meeting WHERE id = ?", (meeting_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
+    return cursor.fetchone()
 
 def fetch_upcoming_meeting():
+    return _fetch_upcoming_meeting(current_date())
+
+@cached_until_changed("meeting.db", "meeting")
+def _fetch_upcoming_meeting(today):
     conn, _ = connect_meeting_db()
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
     query = """
     SELECT *
     FROM meeting
-    WHERE meetingDate >= DATE('now')
+    WHERE meetingDate >= ?
     ORDER BY meetingDate ASC, startTime ASC
     LIMIT 1;
     """
-    cursor.execute(query)
-    row = cursor.fetchone()
+    cursor.execute(query, (today,))
+    return cursor.fetchone()
+
+@cached_until_changed("meeting.db", "meeting")
+def load_meetings_in_window(window_start, window_end):
+    """
+    Returns the meetings dated from window_start up to, not including, window_end, by date and start time.
 
-    # Close the connection
-    conn.close()
-    # Return the result as a dictionary
-    return dict(row) if row else None
+    Only the visible calendar window is read, through idx_meeting_date_start.
+
+    Parameters:
+        window_start (str): First date of the window, YYYY-MM-DD.
+        window_end (str): Day after the last date of the window, YYYY-MM-DD.
+    """
+    conn, _ = connect_meeting_db()
+    cursor = conn.cursor()
+    cursor.row_factory = row_factory_for(Meeting)
+    cursor.execute("""
+        SELECT *
+        FROM meeting
+        WHERE meetingDate >= ? AND meetingDate < ?
+        ORDER BY meetingDate, startTime, id
+    """, (window_start, window_end))
+    return cursor.fetchall()
+
+def to_calendar_events(meetings):
+    """Returns streamlit_calendar events for meetings, with ISO start and end timestamps."""
+    return [
+        {
+            "id": meeting.id,
+            "title": meeting.meetingTitle,
+            "start": f"{meeting.meetingDate}T{meeting.startTime}",
+            "end": f"{meeting.meetingDate}T{meeting.endTime}",
+            "display": "block",
+        }
+        for meeting in meetings
+    ]
+
+def load_meeting_bundle(meeting_id):
+    """
+    Loads everything the meeting page shows in one read transaction on one connection.
+
+    item.db, attachment.db, attendance.db and personnel.db are ATTACHed to the meeting
+    connection, so the meeting, its items, their attachments and the attendance roster
+    are read as one consistent snapshot.
+
+    Returns:
+        dict: meeting (Meeting or None), items (MeetingItem rows sorted by purpose),
+        attachments (item id -> list of Attachment rows) and attendance (AttendanceRecord rows).
+        None if meeting_id is not a valid id.
+    """
+    try:
+        meeting_id = int(meeting_id)
+    except (TypeError, ValueError):
+        return None
+
+    conn = get_attached_connection("meeting.db", ["item.db", "attachment.db", "attendance.db", "personnel.db"])
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        cursor.row_factory = row_factory_for(Meeting)
+        cursor.execute("SELECT * FROM meeting WHERE id = ?", (meeting_id,))
+        meeting = cursor.fetchone()
+
+        cursor.row_factory = row_factory_for(MeetingItem)
+        cursor.execute("""
+            SELECT * FROM item.Item
+            WHERE meetingId = ?
+            ORDER BY purpose NULLS LAST, id
+        """, (meeting_id,))
+        items = cursor.fetchall()
+
+        attachments = {item.id: [] for item in items}
+        cursor.row_factory = row_factory_for(Attachment)
+        cursor.execute("""
+            SELECT a.id, a.item_id, a.filename, a.file_type, a.file_size,
+                   datetime(a.uploaded_on, 'unixepoch') as upload_date
+            FROM attachment.attachments a
+            WHERE a.item_id IN (SELECT id FROM item.Item WHERE meetingId = ?)
+            ORDER BY a.item_id, a.filename
+        """, (meeting_id,))
+        for attachment in cursor.fetchall():
+            attachments[attachment.item_id].append(attachment)
+
+        cursor.row_factory = row_factory_for(AttendanceRecord)
+        cursor.execute("""
+            SELECT n.perNum as PerNum, p.name as Name, p.designation as Designation, n.meeting_id as MeetingId,
+                   n.item_id as ItemID, n.attendance_flag as Attendance, n.role as Role, n.remarks as Remarks
+            FROM attendance.nonselect_attendance n
+            LEFT JOIN personnel.personnel p ON p.perNum = n.perNum
+            WHERE n.meeting_id = ?
+            ORDER BY n.perNum
+        """, (meeting_id,))
+        attendance = cursor.fetchall()
+    finally:
+        # Only read, so ending the transaction with a rollback releases the snapshot
+        conn.rollback()
+
+    return {
+        "meeting": meeting,
+        "items": items,
+        "attachments": attachments,
+        "attendance": attendance,
+    }
 
 def create_meeting(meeting_details):
     required_keys = [
@@ -175,20 +346,18 @@ def create_meeting(meeting_details):
     values = tuple(meeting_details[key] for key in required_keys)
 
     # Connect to the database and execute the query
+    conn, _ = connect_meeting_db()
     try:
-        conn, _ = connect_meeting_db()
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
         meeting_id = cursor.lastrowid
         print("Meeting successfully created.")
         st.toast("Meeting successfully created.")
-        conn.close()
         return meeting_id
     except sqlite3.Error as e:
         print(f"An error occurred while inserting the meeting: {e}")
-    
-    conn.close()
+        conn.rollback()
 
 def update_meeting(meeting_id, updates):
     if not updates:
@@ -206,8 +375,8 @@ def update_meeting(meeting_id, updates):
     values = tuple(updates.values()) + (meeting_id,)
 
     # Connect to the database and execute the query
+    conn, _ = connect_meeting_db()
     try:
-        conn, _ = connect_meeting_db()
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
@@ -215,8 +384,8 @@ def update_meeting(meeting_id, updates):
         st.toast("Meeting successfully updated.")
     except sqlite3.Error as e:
         print(f"An error occurred while updating the meeting: {e}")
+        conn.rollback()
 
-    conn.close()
     return meeting_id
 
 def update_meeting_status(meeting_id, new_status):
@@ -230,8 +399,8 @@ def update_meeting_status(meeting_id, new_status):
     WHERE id = ?
     """
     # Connect to the database and execute the query
+    conn, _ = connect_meeting_db()
     try:
-        conn, _ = connect_meeting_db()
         cursor = conn.cursor()
         cursor.execute(query, (meeting_id,))
         conn.commit()
@@ -239,8 +408,7 @@ def update_meeting_status(meeting_id, new_status):
         st.toast("Meeting Agenda Status successfully updated.")
     except sqlite3.Error as e:
         print(f"An error occurred while updating the meeting status: {e}")
-
-    conn.close()
+        conn.rollback()
 
 
 def delete_meeting(meeting_id):
@@ -249,8 +417,8 @@ def delete_meeting(meeting_id):
     WHERE id = ?
     """
 
+    conn, _ = connect_meeting_db()
     try:
-        conn, _ = connect_meeting_db()
         cursor = conn.cursor()
         cursor.execute(query, (meeting_id,))
         conn.commit()
@@ -258,5 +426,4 @@ def delete_meeting(meeting_id):
         st.toast("Meeting successfully deleted.")
     except sqlite3.Error as e:
         print(f"An error occurred while deleting the meeting: {e}")
-
-    conn.close()
+        conn.rollback()
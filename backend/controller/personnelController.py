@@ -0,0 +1,255 @@
+import csv
+import heapq
+import io
+import json
+import re
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from backend.database.connectionManager import get_connection
+from backend.database.changeTracker import cached_until_changed
+
+SEARCH_LIMIT = 20  # Most matches returned to a typeahead picker
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _normalize(text):
+    return " ".join(_TOKEN_PATTERN.findall((text or "").lower()))
+
+
+class PersonnelIndex:
+    """
+    In-memory directory of personnel for instant lookups and typeahead search.
+
+    People are keyed by perNum and ranked by name. Query words are matched against
+    the start of words in name, designation and perNum through a sorted token list.
+    Matches inside words come from scanning one string holding everyone's searchable
+    text in name order, so the first hits found are also the best ranked.
+    """
+
+    def __init__(self, rows):
+        self.people = {
+            perNum: {"perNum": perNum, "name": name, "designation": designation}
+            for perNum, name, designation in rows
+        }
+        ranked = sorted(self.people, key=lambda perNum: ((self.people[perNum]["name"] or "").lower(), perNum))
+        self.rank = {perNum: position for position, perNum in enumerate(ranked)}
+
+        tokens = []
+        lines = []
+        for perNum in ranked:
+            person = self.people[perNum]
+            text = _normalize(f"{person['name']} {person['designation']}")
+            lines.append(text)
+            for token in set(text.split()) | {str(perNum)}:
+                tokens.append((token, perNum))
+        tokens.sort()
+        self.token_keys = [token for token, _ in tokens]
+        self.token_perNums = [perNum for _, perNum in tokens]
+
+        self.ranked = ranked
+        self.text = "\n".join(lines)
+        # Offset in self.text where each person's line starts, in rank order
+        self.line_starts = []
+        offset = 0
+        for line in lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+
+    def __len__(self):
+        return len(self.people)
+
+    def get(self, perNum):
+        """Returns the person with perNum, or None."""
+        return self.people.get(perNum)
+
+    def _prefix_matches(self, prefix):
+        start = bisect_left(self.token_keys, prefix)
+        end = bisect_left(self.token_keys, prefix + "\uffff", start)
+        return set(self.token_perNums[start:end])
+
+    def _substring_matches(self, text, limit, exclude):
+        matches = []
+        position = self.text.find(text)
+        while position != -1 and len(matches) < limit:
+            line = bisect_left(self.line_starts, position + 1) - 1
+            perNum = self.ranked[line]
+            if perNum not in exclude:
+                matches.append(perNum)
+            # Continue from the next person's line
+            next_line = line + 1
+            if next_line >= len(self.line_starts):
+                break
+            position = self.text.find(text, self.line_starts[next_line])
+        return matches
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        Returns up to limit people matching query, ranked by name.
+
+        Every word of the query has to start a word of the person's name, designation
+        or perNum; if that finds fewer than limit people, people containing the query
+        anywhere in their name or designation are added.
+        """
+        text = _normalize(query)
+        if not text:
+            return []
+
+        matches = None
+        for word in text.split():
+            word_matches = self._prefix_matches(word)
+            matches = word_matches if matches is None else matches & word_matches
+            if not matches:
+                break
+
+        results = heapq.nsmallest(limit, matches, key=self.rank.__getitem__)
+        if len(results) < limit:
+            results += self._substring_matches(text, limit - len(results), set(results))
+        return [self.people[perNum] for perNum in results]
+
+
+@cached_until_changed("personnel.db", "personnel")
+def get_personnel_index():
+    """Returns the shared PersonnelIndex, rebuilt only after personnel.db changes."""
+    conn, _ = get_connection("personnel.db")
+    rows = conn.execute("SELECT perNum, name, designation FROM personnel").fetchall()
+    return PersonnelIndex(rows)
+
+
+def search_personnel(query, limit=SEARCH_LIMIT):
+    """Typeahead search over the personnel directory by name, designation or perNum."""
+    return get_personnel_index().search(query, limit)
+
+
+def get_personnel(perNum):
+    """Returns name and designation of perNum from the in-memory index, or None."""
+    try:
+        return get_personnel_index().get(int(perNum))
+    except (TypeError, ValueError):
+        return None
+
+
+def _open_import_source(source, mode):
+    """Returns (text stream, close flag) for a path or a text/binary file object."""
+    if isinstance(source, (str, Path)):
+        return open(source, mode, encoding="utf-8-sig", newline=""), True
+    if isinstance(source, io.TextIOBase):
+        return source, False
+    return io.TextIOWrapper(source, encoding="utf-8-sig", newline=""), False
+
+
+def _iter_import_records(stream, file_format):
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+    elif file_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    elif file_format == "json":
+        # A JSON array has to be parsed whole; use JSON Lines for very large exports
+        yield from json.load(stream)
+    else:
+        raise ValueError(f"Unsupported personnel import format: {file_format}")
+
+
+def _iter_personnel_rows(records, skipped):
+    for record in records:
+        try:
+            perNum = int(record["perNum"])
+        except (KeyError, TypeError, ValueError):
+            skipped.append(record)
+            continue
+        yield (perNum, record.get("name"), record.get("designation"), record.get("role") or "")
+
+
+def import_personnel(source, file_format=None, delete_missing=True):
+    """
+    Syncs the personnel table with an HR export, writing only what changed.
+
+    The export is streamed into a TEMP staging table and diffed against personnel with
+    set-based statements, all in one transaction. People missing from the export are
+    deleted unless delete_missing is False.
+
+    Parameters:
+        source: Path or file object of a CSV, JSON array or JSON Lines export with
+            perNum, name, designation and optionally role.
+        file_format (str): "csv", "json" or "jsonl"; taken from the file suffix if omitted.
+
+    Returns:
+        dict: Counts of inserted, updated, deleted, unchanged and skipped rows.
+    """
+    if file_format is None:
+        file_format = Path(getattr(source, "name", str(source))).suffix.lstrip(".").lower()
+
+    conn, _ = get_connection("personnel.db")
+    stream, close_stream = _open_import_source(source, "r")
+    skipped = []
+    try:
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE IF EXISTS temp.personnel_import")
+        conn.execute(
+            """
+            CREATE TEMP TABLE personnel_import (
+                perNum INTEGER PRIMARY KEY,
+                name TEXT,
+                designation TEXT,
+                role TEXT
+            )
+            """
+        )
+        # executemany pulls rows from the generator, so the file is never held in memory
+        conn.executemany(
+            "INSERT OR REPLACE INTO temp.personnel_import VALUES (?, ?, ?, ?)",
+            _iter_personnel_rows(_iter_import_records(stream, file_format), skipped),
+        )
+        staged = conn.execute("SELECT COUNT(*) FROM temp.personnel_import").fetchone()[0]
+
+        deleted = 0
+        if delete_missing:
+            deleted = conn.execute(
+                "DELETE FROM personnel WHERE perNum NOT IN (SELECT perNum FROM temp.personnel_import)"
+            ).rowcount
+        updated = conn.execute(
+            """
+            UPDATE personnel
+            SET name = s.name, designation = s.designation, role = s.role
+            FROM temp.personnel_import s
+            WHERE s.perNum = personnel.perNum
+            AND (personnel.name IS NOT s.name
+                 OR personnel.designation IS NOT s.designation
+                 OR personnel.role IS NOT s.role)
+            """
+        ).rowcount
+        inserted = conn.execute(
+            """
+            INSERT INTO personnel (perNum, name, designation, role)
+            SELECT s.perNum, s.name, s.designation, s.role
+            FROM temp.personnel_import s
+            WHERE NOT EXISTS (SELECT 1 FROM personnel p WHERE p.perNum = s.perNum)
+            """
+        ).rowcount
+        conn.execute("DROP TABLE temp.personnel_import")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if close_stream:
+            stream.close()
+
+    counts = {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": staged - inserted - updated,
+        "skipped": len(skipped),
+    }
+    print(f"Personnel import: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    # Nightly sync: python -m backend.controller.personnelController <export.csv|.json|.jsonl>
+    import_personnel(sys.argv[1])
@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import timedelta
+from backend.controller.itemController import connect_item_db, occupies_capacity_sql
+from backend.database.changeTracker import get_table_versions
+from utils.dateUtils import time_string_to_datetime_obj
+
+
+class AgendaTimeline:
+    """
+    Slots of the presented Tier 1 items of a meeting that take up its time, in agenda order.
+
+    Each item's end is kept as minutes from the meeting start, a running sum of
+    durations. Changing one item's duration or order only recomputes the ends from
+    that item's position onwards; the slots before it are left as they are.
+    """
+
+    def __init__(self, items=()):
+        self.order = []  # (itemOrder, id) in agenda order
+        self.keys = {}  # id -> itemOrder
+        self.durations = {}  # id -> minutes
+        self.ends = []  # Minutes from the meeting start at which each item in order ends
+        self.sync(items)
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def minutes_taken(self):
+        return self.ends[-1] if self.ends else 0
+
+    def _remove(self, item_id):
+        position = bisect_left(self.order, (self.keys.pop(item_id), item_id))
+        del self.order[position]
+        del self.durations[item_id]
+        return position
+
+    def _insert(self, item_id, item_order, duration):
+        self.keys[item_id] = item_order
+        self.durations[item_id] = duration or 0
+        insort(self.order, (item_order, item_id))
+        return bisect_left(self.order, (item_order, item_id))
+
+    def _recompute_from(self, position):
+        total = self.ends[position - 1] if position > 0 else 0
+        del self.ends[position:]
+        for _, item_id in self.order[position:]:
+            total += self.durations[item_id]
+            self.ends.append(total)
+
+    def _apply(self, item_id, item_order, duration):
+        """Updates one item in order and durations, returning the first position whose slot moved, or None."""
+        presented = item_order is not None and item_order > 0
+        if item_id not in self.keys:
+            return self._insert(item_id, item_order, duration) if presented else None
+        if not presented:
+            return self._remove(item_id)
+        if self.keys[item_id] != item_order:
+            return min(self._remove(item_id), self._insert(item_id, item_order, duration))
+        if self.durations[item_id] != (duration or 0):
+            self.durations[item_id] = duration or 0
+            return bisect_left(self.order, (item_order, item_id))
+        return None
+
+    def update_item(self, item_id, item_order, duration):
+        """Adds, moves or re-times one item; an itemOrder of 0 or None takes it off the timeline."""
+        position = self._apply(item_id, item_order, duration)
+        if position is not None:
+            self._recompute_from(position)
+
+    def sync(self, items):
+        """
+        Brings the timeline in line with items, (id, itemOrder, duration) of every presented item.
+
+        Only the ends from the first item whose slot changed are recomputed.
+        """
+        items = {item_id: (item_order, duration) for item_id, item_order, duration in items}
+        first_changed = len(self.ends)
+        for item_id in [item_id for item_id in self.keys if item_id not in items]:
+            first_changed = min(first_changed, self._remove(item_id))
+        for item_id, (item_order, duration) in items.items():
+            position = self._apply(item_id, item_order, duration)
+            if position is not None:
+                first_changed = min(first_changed, position)
+        if first_changed < len(self.order) or len(self.ends) != len(self.order):
+            self._recompute_from(min(first_changed, len(self.ends)))
+
+    def slots(self, start_time):
+        """Returns {item id: (start, end)} as HH:MM times, counted from the meeting's start_time."""
+        start = time_string_to_datetime_obj(start_time)
+        slots = {}
+        previous_end = 0
+        for (_, item_id), end in zip(self.order, self.ends):
+            slots[item_id] = (
+                (start + timedelta(minutes=previous_end)).strftime("%H:%M"),
+                (start + timedelta(minutes=end)).strftime("%H:%M"),
+            )
+            previous_end = end
+        return slots
+
+
+_timelines = {}  # meeting id -> [Item table version, AgendaTimeline, summary key, summary]
+_timelines_lock = threading.Lock()
+
+
+def _read_presented_items(meeting_id):
+    """Presented Tier 1 items of a meeting, leaving out rejected and waitlisted ones."""
+    capacity_condition, capacity_params = occupies_capacity_sql()
+    return connect_item_db().execute(
+        f"""
+        SELECT id, itemOrder, duration
+        FROM Item
+        WHERE meetingId = ?
+        AND tier = 1
+        AND itemOrder > 0
+        AND {capacity_condition}
+        ORDER BY itemOrder, id
+        """,
+        (meeting_id, *capacity_params),
+    ).fetchall()
+
+
+def get_meeting_timeline(meeting):
+    """
+    Returns the timetable of a meeting from its cached AgendaTimeline.
+
+    Timelines are shared across sessions. After the Item table changes, only the
+    meeting's presented Tier 1 items are re-read and applied to its timeline as a diff.
+    Rejected and waitlisted items are left off, see occupies_capacity.
+
+    Parameters:
+        meeting: Meeting row, or any mapping with id, startTime and totalDuration.
+
+    Returns:
+        dict: slots (item id -> (start, end) HH:MM), minutesTaken, minutesLeft and
+        overrun (True if the presented items run past the meeting's duration).
+    """
+    meeting_id = meeting["id"]
+    version = get_table_versions("item.db", ("Item",))
+    summary_key = (version, meeting["startTime"], meeting["totalDuration"])
+    with _timelines_lock:
+        cached = _timelines.get(meeting_id)
+        if cached is not None and cached[2] == summary_key:
+            return cached[3]
+
+    items = _read_presented_items(meeting_id) if cached is None or cached[0] != version else None
+    with _timelines_lock:
+        cached = _timelines.setdefault(meeting_id, [None, AgendaTimeline(), None, None])
+        if items is not None:
+            cached[1].sync(items)
+            cached[0] = version
+        timeline = cached[1]
+        minutes_taken = timeline.minutes_taken
+        summary = {
+            "slots": timeline.slots(meeting["startTime"]),
+            "minutesTaken": minutes_taken,
+            "minutesLeft": (meeting["totalDuration"] or 0) - minutes_taken,
+            "overrun": minutes_taken > (meeting["totalDuration"] or 0),
+        }
+        cached[2:] = [summary_key, summary]
+    return summary
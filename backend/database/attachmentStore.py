@@ -0,0 +1,89 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_STORE_DIR = Path(__file__).parent / "attachments"
+CHUNK_SIZE = 1024 * 1024  # 1MB per read/write when streaming attachment bytes
+
+
+class ContentAddressedFileStore:
+    """
+    Keeps attachment bytes on disk, one file per distinct content.
+
+    Files live under <root>/<hash[:2]>/<hash[2:4]>/<hash> where hash is the SHA-256
+    of the content, so identical uploads share a single file.
+    """
+    name = "file"
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).exists()
+
+    def put(self, data: bytes) -> str:
+        """Stores data if its content is not already present and returns its SHA-256."""
+        sha256, _ = self.put_chunks([data])
+        return sha256
+
+    def put_chunks(self, chunks):
+        """
+        Streams chunks into the store while hashing them, holding one chunk in memory at a time.
+
+        Returns:
+            tuple: (sha256, size) of the stored content.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256)
+            if path.exists():
+                os.unlink(tmp_path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return sha256, size
+
+    def open(self, sha256: str):
+        return open(self.path_for(sha256), "rb")
+
+    def read(self, sha256: str) -> bytes:
+        with self.open(sha256) as f:
+            return f.read()
+
+    def delete(self, sha256: str):
+        try:
+            self.path_for(sha256).unlink()
+        except FileNotFoundError:
+            pass
+
+
+# Stores that can hold attachment bytes outside attachment.db, keyed by the
+# value recorded in attachments.storage. Rows with storage 'sqlite' keep their
+# bytes inline in file_data.
+ATTACHMENT_STORES = {
+    ContentAddressedFileStore.name: ContentAddressedFileStore(),
+}
+
+
+def get_attachment_store(name):
+    """Returns the registered store for name, or None for bytes kept inline in SQLite."""
+    return ATTACHMENT_STORES.get(name)
@@ -0,0 +1,83 @@
+import json
+
+
+def _to_python(value):
+    """Unwraps numpy scalars from DataFrame cells so sqlite3 can bind them."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def _group_by_columns(rows):
+    """Groups (columns, values) pairs by their column tuple, keeping first-seen order."""
+    groups = {}
+    for columns, values in rows:
+        groups.setdefault(columns, []).append(values)
+    return groups.items()
+
+
+def apply_change_set(conn, table, df, changes, writable_columns, key="id", insertable_columns=None):
+    """
+    Applies a st.data_editor change set to table in one transaction, writing only the edited cells.
+
+    Edited rows are grouped by the set of columns that changed and each group is
+    written with one executemany, so editing one field never rewrites the others.
+    Edits to columns outside writable_columns are ignored. Deleted rows are removed
+    by key and added rows inserted with their insertable_columns (writable_columns
+    by default). If any statement fails nothing is written and the error is raised.
+
+    Parameters:
+        df: DataFrame or Styler shown in the data_editor; row positions in changes index into it.
+        changes (dict): The data_editor's edited_rows, added_rows and deleted_rows.
+        key (str): Primary key column of table, also a column of df.
+
+    Returns:
+        list: The edited and added rows as stored after the commit, as dicts.
+    """
+    df = getattr(df, "data", df)
+    writable_columns = set(writable_columns)
+    insertable_columns = set(insertable_columns or writable_columns)
+
+    edits = []
+    edited_keys = []
+    for position, delta in changes.get("edited_rows", {}).items():
+        columns = tuple(sorted(column for column in delta if column in writable_columns))
+        if not columns:
+            continue
+        row_key = _to_python(df.iloc[int(position)][key])
+        edits.append((columns, [delta[column] for column in columns] + [row_key]))
+        edited_keys.append(row_key)
+
+    deleted_keys = [(_to_python(df.iloc[int(position)][key]),) for position in changes.get("deleted_rows", [])]
+
+    inserts = []
+    for row in changes.get("added_rows", []):
+        columns = tuple(sorted(column for column in row if column in insertable_columns))
+        if columns:
+            inserts.append((columns, [row[column] for column in columns]))
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for columns, rows in _group_by_columns(edits):
+            set_clause = ", ".join(f"{column} = ?" for column in columns)
+            conn.executemany(f"UPDATE {table} SET {set_clause} WHERE {key} = ?", rows)
+
+        if deleted_keys:
+            conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", deleted_keys)
+
+        # Rows inserted below get rowids above this, no other writer can interleave under BEGIN IMMEDIATE
+        last_rowid = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+        for columns, rows in _group_by_columns(inserts):
+            placeholders = ", ".join("?" * len(columns))
+            conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+        cursor = conn.execute(
+            f"SELECT * FROM {table} WHERE {key} IN (SELECT value FROM json_each(?)) OR rowid > ?",
+            (json.dumps(edited_keys), last_rowid),
+        )
+        names = [column[0] for column in cursor.description]
+        new_rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return new_rows
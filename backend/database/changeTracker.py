@@ -0,0 +1,62 @@
+import functools
+import threading
+from collections import OrderedDict
+from backend.database.connectionManager import get_connection
+
+MAX_CACHED_RESULTS = 256  # Per decorated function, least recently used results are dropped first
+
+
+def get_table_versions(db_name, tables):
+    """Returns the current write counters of tables in db_name, as maintained by the table_version triggers."""
+    conn, _ = get_connection(db_name)
+    placeholders = ", ".join("?" * len(tables))
+    rows = conn.execute(
+        f"SELECT table_name, version FROM table_version WHERE table_name IN ({placeholders})", tables
+    ).fetchall()
+    versions = dict(rows)
+    return tuple(versions.get(table) for table in tables)
+
+
+def cached_until_changed(db_name, *tables, depends_on=()):
+    """
+    Caches a function's results across sessions until one of tables in db_name is written to.
+
+    depends_on lists further (db_name, tables) pairs the results are read from,
+    e.g. the personnel table joined into attendance rows. Every call reads the
+    tables' versions, so a write from any connection or Streamlit process
+    invalidates the cached results. Results are shared between callers and
+    must not be mutated.
+    """
+    sources = [(db_name, tables)] + [(source_db, tuple(source_tables)) for source_db, source_tables in depends_on]
+
+    def decorator(func):
+        results = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            versions = tuple(get_table_versions(source_db, source_tables) for source_db, source_tables in sources)
+            with lock:
+                cached = results.get(key)
+                if cached is not None and cached[0] == versions:
+                    results.move_to_end(key)
+                    return cached[1]
+
+            # Versions are read before the query, so a concurrent write can only make the entry stale early
+            value = func(*args, **kwargs)
+            with lock:
+                results[key] = (versions, value)
+                results.move_to_end(key)
+                while len(results) > MAX_CACHED_RESULTS:
+                    results.popitem(last=False)
+            return value
+
+        def clear():
+            with lock:
+                results.clear()
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
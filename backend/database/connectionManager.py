@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from backend.database.migrations import apply_migrations
+
+DB_DIR = Path(__file__).parent
+
+# Applied once when a connection is opened instead of on every query.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Idle connections kept per database file for the next thread; any more are closed
+MAX_IDLE_CONNECTIONS = 8
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_idle = {}  # database path -> connections no thread is using
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _record(db_name, counter, elapsed=0.0):
+    with _stats_lock:
+        stats = _stats.setdefault(db_name, {"opened": 0, "pooled": 0, "reused": 0, "open_seconds": 0.0})
+        stats[counter] += 1
+        stats["open_seconds"] += elapsed
+
+
+class _ThreadConnections:
+    """Holds one thread's connections; when the thread ends they go back to the pool."""
+
+    def __init__(self):
+        self.connections = {}
+        weakref.finalize(self, _release, self.connections)
+
+
+def _release(connections):
+    """Hands a finished thread's connections back to the pool, closing those it has no room for."""
+    for path, conn in connections.items():
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            continue
+        with _pool_lock:
+            idle = _idle.setdefault(path, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+    connections.clear()
+
+
+def _thread_connections():
+    holder = getattr(_local, "holder", None)
+    if holder is None:
+        holder = _local.holder = _ThreadConnections()
+    return holder.connections
+
+
+def get_connection(db_name):
+    """
+    Returns the current thread's connection to db_name.
+
+    Streamlit runs every rerun on a new thread. A thread's first call takes an idle
+    connection from the process-wide pool, left there by a thread that has ended,
+    so PRAGMAs, the migration check and ATTACHes are only paid when the pool is
+    empty. Opening a connection also brings the database schema up to date.
+
+    Returns:
+        tuple: (sqlite3.Connection, bool) where the flag is True only for the call
+        that created the database file.
+    """
+    connections = _thread_connections()
+    db_filename = DB_DIR / db_name
+    path = str(db_filename)
+
+    conn = connections.get(path)
+    if conn is not None:
+        _record(db_name, "reused")
+        return conn, False
+
+    with _pool_lock:
+        idle = _idle.get(path)
+        conn = idle.pop() if idle else None
+    if conn is not None:
+        connections[path] = conn
+        _record(db_name, "pooled")
+        return conn, False
+
+    started = time.perf_counter()
+    db_already_exists = db_filename.exists()
+
+    # Pooled connections move between threads, but only one thread uses a connection at a time
+    conn = sqlite3.connect(db_filename, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    apply_migrations(conn, db_name)
+
+    connections[path] = conn
+    _record(db_name, "opened", time.perf_counter() - started)
+    return conn, not db_already_exists
+
+
+def get_attached_connection(db_name, attached_db_names):
+    """
+    Returns the current thread's connection to db_name with attached_db_names ATTACHed to it.
+
+    Each attached database is reachable under its file stem as schema name, e.g. item.Item
+    for item.db, so one statement can read across database files.
+    """
+    conn, _ = get_connection(db_name)
+    attached_schemas = {row[1] for row in conn.execute("PRAGMA database_list")}
+    for attached_db_name in attached_db_names:
+        schema = Path(attached_db_name).stem
+        if schema in attached_schemas:
+            continue
+        # Opening it on its own first brings its schema up to date
+        get_connection(attached_db_name)
+        conn.execute("ATTACH DATABASE ? AS " + schema, (str(DB_DIR / attached_db_name),))
+    return conn
+
+
+def close_connections():
+    """Closes the current thread's connections and every idle pooled one."""
+    connections = _thread_connections()
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+    with _pool_lock:
+        idle = [conn for conns in _idle.values() for conn in conns]
+        _idle.clear()
+    for conn in idle:
+        conn.close()
+
+
+def get_connection_stats():
+    """
+    Returns a snapshot of the connection counters and time spent opening, per database.
+
+    opened counts new connections, pooled connections a new thread took from the
+    pool, and reused calls answered by the thread's own connection.
+    """
+    with _stats_lock:
+        return {db_name: dict(stats) for db_name, stats in _stats.items()}
@@ -0,0 +1,336 @@
+"""
+Versioned schema migrations for every database, tracked with PRAGMA user_version.
+
+Each database has an ordered list of migrations. Migration N brings a database
+from user_version N-1 to N. New schema changes are appended as new migrations;
+migrations that have shipped are never edited.
+"""
+
+
+def add_column_if_missing(conn, table, column, column_type):
+    """Adds a column unless it is already there, for databases patched before migrations existed."""
+    existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in existing_columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def add_change_tracking(conn, tables):
+    """
+    Keeps a version counter per table in table_version, bumped by triggers on every write.
+
+    The counters live in the database file, so every connection and process sees the same versions.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_version (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for table in tables:
+        conn.execute("INSERT OR IGNORE INTO table_version (table_name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_version SET version = version + 1 WHERE table_name = '{table}';
+                END
+                """
+            )
+
+
+def meeting_v1_create_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS meeting (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meetingTitle TEXT,
+            meetingDate TEXT,
+            description TEXT,
+            startTime TEXT,
+            endTime TEXT,
+            totalDuration INTEGER,
+            minutesLeft INTEGER,
+            minutesTaken INTEGER,
+            location TEXT,
+            createdBy TEXT,
+            createdOn INTEGER,
+            status TEXT
+        )
+        """
+    )
+
+
+def meeting_v2_add_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meeting_date_start ON meeting (meetingDate, startTime)")
+
+
+def meeting_v3_add_status_index(conn):
+    # Meeting history filtered by status, newest first
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meeting_status_date ON meeting (status, meetingDate, startTime)")
+
+
+def meeting_v4_add_change_tracking(conn):
+    add_change_tracking(conn, ["meeting"])
+
+
+def item_v1_create_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS Item (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meetingId INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            purpose TEXT,
+            tier INTEGER,
+            selectFlag INTEGER,
+            duration INTEGER,
+            itemOwner TEXT,
+            additionalAttendees TEXT,
+            status TEXT,
+            createdBy TEXT,
+            createdOn INTEGER,
+            itemOrder INTEGER DEFAULT 0
+        )
+        """
+    )
+    add_column_if_missing(conn, "Item", "itemOrder", "INTEGER DEFAULT 0")
+
+
+def item_v2_add_indexes(conn):
+    # Agenda editors filter by meeting and tier and sort by itemOrder
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_meeting_tier_order ON Item (meetingId, tier, itemOrder)")
+    # Meeting page lists all items of a meeting by purpose
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_meeting_purpose ON Item (meetingId, purpose)")
+
+
+def item_v3_add_change_tracking(conn):
+    add_change_tracking(conn, ["Item"])
+
+
+def item_v4_fractional_item_order(conn):
+    # itemOrder is a fractional order key, 0 for items that are not presented.
+    # REAL keys keep their value in the INTEGER column, which only converts whole numbers.
+    conn.execute("UPDATE Item SET itemOrder = 0 WHERE itemOrder IS NULL")
+
+
+def item_v5_order_index_with_purpose(conn):
+    # Agenda order ties (items not presented have itemOrder 0) are broken by purpose, missing purposes last
+    conn.execute("DROP INDEX IF EXISTS idx_item_meeting_tier_order")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_item_meeting_tier_order_purpose "
+        "ON Item (meetingId, tier, itemOrder, purpose IS NULL, purpose)"
+    )
+
+
+def attachment_v1_create_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER,
+            filename TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            file_data BLOB NOT NULL
+        )
+        """
+    )
+
+
+def attachment_v2_add_metadata_columns(conn):
+    add_column_if_missing(conn, "attachments", "file_size", "INTEGER")
+    add_column_if_missing(conn, "attachments", "uploaded_on", "INTEGER")
+    add_column_if_missing(conn, "attachments", "sha256", "TEXT")
+    add_column_if_missing(conn, "attachments", "storage", "TEXT NOT NULL DEFAULT 'sqlite'")
+    conn.execute("UPDATE attachments SET file_size = LENGTH(file_data) WHERE file_size IS NULL")
+
+
+def attachment_v3_add_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attachments_item_id ON attachments (item_id, filename)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments (sha256)")
+
+
+def personnel_v1_create_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS personnel (
+            perNum INTEGER PRIMARY KEY,
+            name TEXT,
+            designation TEXT,
+            role TEXT check (role in ('HOD','Permanent',''))
+        )
+        """
+    )
+
+
+def personnel_v2_add_change_tracking(conn):
+    add_change_tracking(conn, ["personnel"])
+
+
+def attendance_v1_create_tables(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS secretariat (
+            perNum INTEGER PRIMARY KEY,
+            name TEXT,
+            designation TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS coremembers (
+            perNum INTEGER PRIMARY KEY,
+            name TEXT,
+            designation TEXT,
+            role TEXT check(role in ('HOD','Permanent'))
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS item_owners (
+            perNum INTEGER PRIMARY KEY,
+            name TEXT,
+            designation TEXT,
+            meeting_id NOT NULL,
+            item_id not NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS additional_attendees (
+            perNum INTEGER,
+            name TEXT,
+            designation TEXT,
+            meeting_id NOT NULL,
+            item_id not NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS nonselect_attendance (
+            perNum INTEGER,
+            name TEXT,
+            designation TEXT,
+            meeting_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            attendance_flag BOOLEAN NOT NULL ,
+            role TEXT CHECK(role in ('HOD', 'Permanent', 'Secretariat', 'ItemOwner', 'AdditionalAttendee', 'DesignateReplacement')),
+            remarks TEXT
+        )
+        """
+    )
+
+
+def attendance_v2_add_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_nonselect_attendance_meeting ON nonselect_attendance (meeting_id, item_id, perNum)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_item_owners_meeting ON item_owners (meeting_id, item_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_additional_attendees_meeting ON additional_attendees (meeting_id, item_id)")
+
+
+def attendance_v3_add_change_tracking(conn):
+    add_change_tracking(conn, ["secretariat", "coremembers", "item_owners", "additional_attendees", "nonselect_attendance"])
+
+
+def attendance_v4_unique_nonselect_attendance(conn):
+    # One attendance row per person, item and meeting; keep the earliest of any duplicates
+    conn.execute(
+        """
+        DELETE FROM nonselect_attendance
+        WHERE perNum IS NOT NULL
+        AND rowid NOT IN (
+            SELECT MIN(rowid) FROM nonselect_attendance GROUP BY meeting_id, item_id, perNum
+        )
+        """
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_nonselect_attendance_meeting")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_nonselect_attendance_key ON nonselect_attendance (meeting_id, item_id, perNum)")
+
+
+def attendance_v5_drop_personnel_copies(conn):
+    # Names and designations are joined from personnel.db when read
+    for table in ("secretariat", "coremembers", "item_owners", "additional_attendees", "nonselect_attendance"):
+        existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in ("name", "designation"):
+            if column in existing_columns:
+                conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+MIGRATIONS = {
+    "meeting.db": [
+        meeting_v1_create_tables,
+        meeting_v2_add_indexes,
+        meeting_v3_add_status_index,
+        meeting_v4_add_change_tracking,
+    ],
+    "item.db": [
+        item_v1_create_tables,
+        item_v2_add_indexes,
+        item_v3_add_change_tracking,
+        item_v4_fractional_item_order,
+        item_v5_order_index_with_purpose,
+    ],
+    "attachment.db": [
+        attachment_v1_create_tables,
+        attachment_v2_add_metadata_columns,
+        attachment_v3_add_indexes,
+    ],
+    "personnel.db": [
+        personnel_v1_create_tables,
+        personnel_v2_add_change_tracking,
+    ],
+    "attendance.db": [
+        attendance_v1_create_tables,
+        attendance_v2_add_indexes,
+        attendance_v3_add_change_tracking,
+        attendance_v4_unique_nonselect_attendance,
+        attendance_v5_drop_personnel_copies,
+    ],
+}
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn, db_name):
+    """
+    Brings db_name up to the latest schema version.
+
+    Pending migrations run in a single write transaction, so concurrent processes
+    apply them once and a failed migration leaves the database untouched.
+    ANALYZE is run afterwards so the planner knows about new indexes.
+
+    Returns:
+        int: The number of migrations applied.
+    """
+    migrations = MIGRATIONS.get(db_name, [])
+    if get_schema_version(conn) >= len(migrations):
+        return 0
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read inside the write lock in case another process migrated first
+        current_version = get_schema_version(conn)
+        for version, migration in enumerate(migrations, start=1):
+            if version > current_version:
+                migration(conn)
+        conn.execute(f"PRAGMA user_version = {len(migrations)}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    applied = len(migrations) - current_version
+    if applied > 0:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
@@ -0,0 +1,63 @@
+import functools
+from dataclasses import fields
+
+
+@functools.lru_cache(maxsize=None)
+def field_names(model):
+    """Returns the column names of a row model, in declaration order."""
+    return tuple(field.name for field in fields(model))
+
+
+class RowModel:
+    """
+    Mapping-style access for slotted row dataclasses.
+
+    Rows read like the dicts pages already index (row["title"], row.get("id")),
+    while each row only stores its values. dict(row) and to_dict() copy a row
+    into a plain dict where one is really needed. pd.DataFrame accepts a list
+    of rows directly.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return field_names(type(self))
+
+    def __contains__(self, key):
+        return key in field_names(type(self))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in field_names(type(self))}
+
+
+@functools.lru_cache(maxsize=None)
+def row_factory_for(model):
+    """
+    Returns a sqlite3 row_factory that builds model instances straight from result tuples.
+
+    When the selected columns are the model's fields in order, as with SELECT * on the
+    model's table, rows are built positionally. Otherwise columns are matched by name.
+    """
+    names = field_names(model)
+    # (cursor.description, columns match names) of the last statement seen
+    last_statement = [(None, False)]
+
+    def row_factory(cursor, row):
+        description = cursor.description
+        statement = last_statement[0]
+        if statement[0] is not description:
+            statement = (description, tuple(column[0] for column in description) == names)
+            last_statement[0] = statement
+        if statement[1]:
+            return model(*row)
+        return model(**{column[0]: value for column, value in zip(description, row)})
+
+    return row_factory
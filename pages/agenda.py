@@ -1,8 +1,12 @@
 import streamlit as st
+import time
 from typing import Dict, List
 from backend.controller.meetingController import *
 from backend.controller.itemController import *
 from backend.controller.attendanceController import *
+from backend.controller.attachmentsController import get_attachment_metadata_for_items
+from backend.controller.timelineController import get_meeting_timeline
+from backend.controller.agendaController import propose_agenda, agenda_proposal_updates, apply_agenda_proposal, waiting_days, plan_waitlist_rescheduling, reschedule_waitlisted_items
 from pages.meeting import display_meeting
 from utils.dateUtils import format_date
 from utils.commonUtils import get_purpose_color_and_value, format_meeting_title
@@ -63,6 +67,16 @@ def get_item_column_config(agenda_size : int):
             width="medium",
             help="Select the status of the agenda item",
         ),
+        "slot": st.column_config.TextColumn(
+            "Slot",
+            disabled=True,
+            help="Start and end time from the order and durations of the presented items",
+        ),
+        "attachments": st.column_config.TextColumn(
+            "Attachments",
+            width="medium",
+            disabled=True,
+        ),
         "email": st.column_config.LinkColumn(
             "Send Email", 
             display_text="Email",
@@ -87,6 +101,74 @@ def style_df(col):
 def get_select_flag_value(flag: int) -> str:
     return ":blue[Select]" if flag == 1 else "Non-Select"
 
+def display_agenda_proposal(meeting_details):
+    proposal = propose_agenda(meeting_details["id"], meeting_details["totalDuration"])
+    with st.expander("Suggested Agenda"):
+        st.caption(
+            "Approved items are kept. Pending, registered and waitlisted items are picked to fit the "
+            f"remaining time, approval before discussion before information, longest waiting first. "
+            f"Uses {proposal['minutesUsed']} of {meeting_details['totalDuration']} minutes."
+        )
+        now = time.time()
+        on_agenda = [(item, True) for item in proposal["kept"] + proposal["chosen"]]
+        proposed_df = pd.DataFrame(
+            [
+                {
+                    "title": item.title,
+                    "purpose": get_purpose_color_and_value(item.purpose or "")[1],
+                    "duration": item.duration,
+                    "status": item.status,
+                    "waiting": waiting_days(item, now),
+                    "proposed": proposed,
+                }
+                for item, proposed in on_agenda + [(item, False) for item in proposal["left_out"]]
+            ],
+            columns=["title", "purpose", "duration", "status", "waiting", "proposed"],
+        )
+        st.dataframe(
+            proposed_df,
+            column_config={
+                "title": "Title",
+                "purpose": "Purpose",
+                "duration": "Duration (minutes)",
+                "status": "Status",
+                "waiting": "Days Waiting",
+                "proposed": st.column_config.CheckboxColumn("On Agenda"),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.button(
+            "Apply Suggested Order",
+            disabled=not agenda_proposal_updates(proposal),
+            on_click=apply_agenda_proposal,
+            args=(proposal,),
+            key="apply_agenda_proposal",
+        )
+
+def display_waitlist_rescheduling():
+    moves, unplaced = plan_waitlist_rescheduling()
+    with st.expander(f"Waitlisted Items ({len(moves) + len(unplaced)})"):
+        st.caption(
+            "Waitlisted items can move to the next upcoming meeting with enough time left, "
+            "highest priority first. Their owners, additional attendees and attendance move with them."
+        )
+        if moves:
+            st.dataframe(
+                pd.DataFrame(moves, columns=["title", "fromMeetingId", "toMeeting"]),
+                column_config={"title": "Title", "fromMeetingId": "From Meeting", "toMeeting": "To Meeting"},
+                hide_index=True,
+                use_container_width=True,
+            )
+        if unplaced:
+            st.warning(f"No upcoming meeting has time for: {', '.join(item['title'] for item in unplaced)}")
+        st.button(
+            "Reschedule Waitlisted Items",
+            disabled=not moves,
+            on_click=reschedule_waitlisted_items,
+            key="reschedule_waitlisted_items",
+        )
+
 def displayAgenda(meeting_details):
     st.subheader("Meeting Agenda Items", divider=True)
     agenda_status = st.selectbox(    
@@ -110,12 +192,28 @@ def displayAgenda(meeting_details):
             send_agenda_email(meeting_details["id"], agenda_status)
 
     st.subheader("Tier 1 Items")
+    timeline = get_meeting_timeline(meeting_details)
+    if timeline["overrun"]:
+        st.warning(f"Presented items run {-timeline['minutesLeft']} minutes over the meeting's {meeting_details['totalDuration']} minutes.")
+    else:
+        st.caption(f"{timeline['minutesTaken']} of {meeting_details['totalDuration']} minutes scheduled, {timeline['minutesLeft']} minutes left.")
     # Get agenda items for selected meeting
     tier_1_items = get_items_by_id_and_tier(meeting_details["id"], 1)
     # Convert to DataFrame for editing
     if tier_1_items:
-        tier_1_agenda = tier_1_items.copy()  # Create a copy to avoid modifying original data
+        tier_1_agenda = [dict(item) for item in tier_1_items]  # Copy the rows, cached query results are shared
+        attachments_by_item = get_attachment_metadata_for_items([item["id"] for item in tier_1_agenda])
+        position = 0
         for item in tier_1_agenda:
+            # Show the position in the agenda rather than the fractional order key
+            if item["itemOrder"] and item["itemOrder"] > 0:
+                position += 1
+                item["itemOrder"] = position
+            else:
+                item["itemOrder"] = 0
+            slot = timeline["slots"].get(item["id"])
+            item["slot"] = f"{slot[0]} - {slot[1]}" if slot else ""
+            item["attachments"] = ", ".join(attachment["filename"] for attachment in attachments_by_item[item["id"]])
             item["selectFlag"] = get_select_flag_value(item["selectFlag"])
             _, purpose_value = get_purpose_color_and_value(item["purpose"])
             item["purpose"] = purpose_value
@@ -124,7 +222,7 @@ def displayAgenda(meeting_details):
 
         tier1_df = pd.DataFrame(
         tier_1_agenda,
-        columns=["itemOrder", "id", "title", "description", "purpose", "selectFlag", "itemOwner", "additionalAttendees", "duration", "status", "email"]
+        columns=["itemOrder", "slot", "id", "title", "description", "purpose", "selectFlag", "itemOwner", "additionalAttendees", "attachments", "duration", "status", "email"]
         )
         # Apply the styling
         tier1_df = tier1_df.style.apply(style_df)
@@ -146,6 +244,7 @@ def displayAgenda(meeting_details):
             args=(tier1_df, st.session_state.tier1_agenda_editor),
             key='tier1_agenda_commit'
             )
+        display_agenda_proposal(meeting_details)
     else:
         st.info("No agenda items found for this meeting. Add new items using the data editor.")
 
@@ -153,8 +252,10 @@ def displayAgenda(meeting_details):
     tier_2_items = get_items_by_id_and_tier(meeting_details["id"], 2)
     # Convert to DataFrame for editing
     if tier_2_items:
-        tier_2_agenda = tier_2_items.copy()  # Create a copy to avoid modifying original data
+        tier_2_agenda = [dict(item) for item in tier_2_items]  # Copy the rows, cached query results are shared
+        attachments_by_item = get_attachment_metadata_for_items([item["id"] for item in tier_2_agenda])
         for item in tier_2_agenda:
+            item["attachments"] = ", ".join(attachment["filename"] for attachment in attachments_by_item[item["id"]])
             item["selectFlag"] = get_select_flag_value(item["selectFlag"])
             _, purpose_value = get_purpose_color_and_value(item["purpose"])
             item["purpose"] = purpose_value
@@ -163,7 +264,7 @@ def displayAgenda(meeting_details):
 
         df = pd.DataFrame(
         tier_2_agenda,
-        columns=["id", "title", "description", "purpose", "selectFlag", "itemOwner", "additionalAttendees", "status", "email"]
+        columns=["id", "title", "description", "purpose", "selectFlag", "itemOwner", "additionalAttendees", "attachments", "status", "email"]
         )
         # Apply the styling
         tier2_df = df.style.apply(style_df)
@@ -190,6 +291,7 @@ def displayAgenda(meeting_details):
 
 
 st.title("Meeting Agenda")
+display_waitlist_rescheduling()
 
 # Get available meetings
 meetings = load_meeting_data()
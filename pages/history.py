@@ -0,0 +1,59 @@
+import streamlit as st
+import pandas as pd
+
+from backend.controller.meetingController import load_meeting_history_page, HISTORY_PAGE_SIZE
+from utils.constants import Meeting_Status
+
+ALL_STATUSES = "All"
+
+st.title(":card_index_dividers: Meeting History")
+
+with st.container(border=True):
+    status_col, location_col, dates_col = st.columns(3)
+    status = status_col.selectbox("Status", [ALL_STATUSES] + [status.value for status in Meeting_Status])
+    location = location_col.text_input("Location")
+    date_range = dates_col.date_input("Date range", value=(), format="DD/MM/YYYY")
+
+filters = {
+    "status": None if status == ALL_STATUSES else status,
+    "location": location.strip() or None,
+    "date_from": date_range[0].isoformat() if len(date_range) > 0 else None,
+    "date_to": date_range[1].isoformat() if len(date_range) > 1 else None,
+}
+
+# Cursors of the pages visited so far; the last one is the page shown. Changing a filter starts over.
+if st.session_state.get("history_filters") != filters:
+    st.session_state.history_filters = filters
+    st.session_state.history_cursors = [None]
+
+cursors = st.session_state.history_cursors
+meetings, next_cursor = load_meeting_history_page(cursors[-1], HISTORY_PAGE_SIZE, **filters)
+
+if meetings:
+    history_df = pd.DataFrame(meetings)
+    history_df["link"] = "/meeting?id=" + history_df["id"].astype(str)
+    st.dataframe(
+        history_df[["meetingDate", "startTime", "endTime", "meetingTitle", "location", "status", "link"]],
+        column_config={
+            "meetingDate": st.column_config.DateColumn("Date", format="DD MMM YYYY"),
+            "startTime": "Start",
+            "endTime": "End",
+            "meetingTitle": "Title",
+            "location": "Location",
+            "status": "Status",
+            "link": st.column_config.LinkColumn("Details", display_text="View"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+else:
+    st.info("No past meetings match these filters.")
+
+prev_col, page_col, next_col = st.columns([1, 2, 1])
+if prev_col.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True):
+    cursors.pop()
+    st.rerun()
+page_col.markdown(f"<p style='text-align: center;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+if next_col.button("Older ▶", disabled=next_cursor is None, use_container_width=True):
+    cursors.append(next_cursor)
+    st.rerun()
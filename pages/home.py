@@ -1,15 +1,17 @@
 import streamlit as st
 
 from backend.controller.meetingController import *
+from backend.controller.timelineController import get_meeting_timeline
 from streamlit_calendar import calendar
 from utils.dateUtils import *
 from utils.constants import Role
-import pandas as pd
 
-from backend.controller.attendanceController import fetch_secretariat_data, fetch_coremembers_data, update_secretariat_data, update_coremembers_data
+from backend.controller.attendanceController import fetch_secretariat_df, fetch_coremembers_df, update_secretariat_data, update_coremembers_data
 calendar_options = {
     "editable": "true",
     "selectable": "true",
+    # Months are switched with the buttons above the calendar, which load that month's meetings
+    "headerToolbar": {"left": "", "center": "title", "right": ""},
     "businessHours": {
         "daysOfWeek": [1, 2, 3, 4, 5],
         "startTime": "09:00",
@@ -67,6 +69,7 @@ def handle_event_click(event):
 def render_meeting_card(meeting):
     meeting_url = f"/meeting?id={meeting['id']}"  # Link to card details page
     formatted_date = format_date(meeting['meetingDate'])
+    minutes_left = get_meeting_timeline(meeting)["minutesLeft"]
     st.markdown(
         f"""
         <a target="_self" href="{meeting_url}" style="text-decoration: none;">
@@ -77,6 +80,8 @@ def render_meeting_card(meeting):
                     Time: {formatted_date}, {meeting['startTime'].replace(":", "")}-{meeting['endTime'].replace(":", "")}h
                     <br>
                     Location: {meeting['location']}
+                    <br>
+                    Time Left: {minutes_left} minutes
                 </p>
             </div>
         </a>
@@ -106,25 +111,28 @@ with leftCol:
         **Email: test@gmail.com**
         """
 
-    # Fetch card data from the database
-    meetings = load_meeting_data()
-    meetings = sorted(meetings, key=lambda x: x["meetingDate"])
-
-    # Convert meetings to events
-    events = [{
-            "title": m["meetingTitle"], 
-            "start": combine_date_and_time(m["meetingDate"], m["startTime"]), 
-            "end": combine_date_and_time(m["meetingDate"], m["endTime"]),
-            "display": "block",
-            "id": m["id"]
-            } 
-            for m in meetings]
+    if "calendar_month" not in st.session_state:
+        st.session_state.calendar_month = datetime.now().date().replace(day=1)
 
     with st.container(border=True):
+        prev_col, today_col, next_col = st.columns(3)
+        if prev_col.button("◀ Previous", use_container_width=True):
+            st.session_state.calendar_month = shift_month(st.session_state.calendar_month, -1)
+        if today_col.button("Today", use_container_width=True):
+            st.session_state.calendar_month = datetime.now().date().replace(day=1)
+        if next_col.button("Next ▶", use_container_width=True):
+            st.session_state.calendar_month = shift_month(st.session_state.calendar_month, 1)
+
+        # Only the meetings in the visible six weeks are loaded, for the calendar and the cards
+        month = st.session_state.calendar_month
+        window_start, window_end = calendar_month_window(month)
+        window_meetings = load_meetings_in_window(window_start.isoformat(), window_end.isoformat())
+
         state = calendar(
-            events=events,
-            options=calendar_options,
-            custom_css=custom_css
+            events=to_calendar_events(window_meetings),
+            options={**calendar_options, "initialDate": month.isoformat()},
+            custom_css=custom_css,
+            key=f"calendar_{month.isoformat()}"
             )
 
         if state.get("callback") is not None and state.get("callback") == "eventClick":
@@ -137,7 +145,11 @@ with rightCol:
     with innerRightCol:
         if st.session_state.role == Role.SECRETARIAT.value:
             st.link_button(label="New Meeting", icon="➕", url="/meeting-form")
-    # Render cards
+    # Render cards of the upcoming meetings shown on the calendar
+    today = current_date()
+    meetings = [meeting for meeting in window_meetings if meeting["meetingDate"] >= today]
+    if not meetings:
+        st.info("No upcoming meetings in these weeks.")
     for meeting in meetings:
         render_meeting_card(meeting)
 
@@ -147,11 +159,7 @@ with st.container():
     with main_attendees_col:
         st.subheader("Main Attendees", divider="green")
 
-        data = fetch_coremembers_data()
-        df = pd.DataFrame(
-            data,
-            columns=["PerNum", "Name", "Designation", "Role"]
-            )
+        df = fetch_coremembers_df()
         if st.session_state.role == Role.SECRETARIAT.value:
             edited_df = st.data_editor(
                 df, 
@@ -182,11 +190,7 @@ with st.container():
     with secretariat_col:
         st.subheader("Secretariat Team", divider="blue")
 
-        data = fetch_secretariat_data()
-        df = pd.DataFrame(
-            data,
-            columns=["PerNum", "Name", "Designation"]
-            )
+        df = fetch_secretariat_df()
         if st.session_state.role == Role.SECRETARIAT.value:
             edited_df = st.data_editor(
                 df, 
@@ -1,9 +1,11 @@
+import functools
 import numpy as np
 import pandas as pd
 import streamlit as st
 from backend.controller.meetingController import fetch_meeting_by_id, load_meeting_data
 from backend.controller.itemController import create_item, get_item_by_id, update_item
-from backend.controller.attachmentsController import save_attachment, get_attachments_for_item, delete_attachment
+from backend.controller.attachmentsController import save_attachment, get_attachment_metadata_for_item, attachment_available, read_attachment_for_download, delete_attachment
+from backend.controller.personnelController import search_personnel
 from datetime import datetime
 from streamlit_extras.switch_page_button import switch_page
 from streamlit_extras import stylable_container
@@ -70,7 +72,7 @@ def upload_attachments(item_id):
     if st.session_state.uploaded_files:
         for file in st.session_state.uploaded_files:
             # Check if file is already uploaded
-            existing_files = get_attachments_for_item(item_id)
+            existing_files = get_attachment_metadata_for_item(item_id)
             if any(file.name == existing["filename"] for existing in existing_files):
                 st.warning(f"File {file.name} already exists! Not saving this file.")
             else:
@@ -127,7 +129,7 @@ def register_item_page():
         
     if item_id is not None:
         item_details = get_item_by_id(item_id)
-        attachments = get_attachments_for_item(item_id)
+        attachments = get_attachment_metadata_for_item(item_id)
 
     formatted_data = [
         {"Formatted": f"{meeting['meetingTitle']} ({format_date(meeting['meetingDate'])})", "id": meeting["id"]}
@@ -155,6 +157,16 @@ def register_item_page():
 
     item_details_col, _ = st.columns([4, 2])
     with item_details_col:
+        # Searching sits outside the form so matches update as soon as a query is entered
+        attendee_query = st.text_input(
+            "Find attendees",
+            placeholder="Search personnel by name, designation or perNum",
+            key="attendee_search"
+        )
+        attendee_matches = search_personnel(attendee_query)
+        if attendee_query and not attendee_matches:
+            st.caption(f"No personnel matching '{attendee_query}'")
+
         with st.form("register_item_form"):
             if meeting_id is None:
                 meeting_date_df = st.selectbox(    
@@ -213,11 +225,18 @@ def register_item_page():
             with col_select:
                 form_data_dict["select_flag"] = st.checkbox("Select?")
         
+            saved_attendees = item_details["additionalAttendees"].split(", ") if item_details.get("additionalAttendees") else []
+            attendee_designations = {person["name"]: person["designation"] for person in attendee_matches}
+            # Keep chosen attendees selectable while the search results change
+            attendee_options = list(dict.fromkeys(
+                saved_attendees + st.session_state.get("attendees", []) + list(attendee_designations)
+            ))
             form_data_dict["additional_attendees"] = st.multiselect(
                 "Add attendees",
-                options=["Attendee 1", "Attendee 2", "Attendee 3", "Attendee 4"],
-                placeholder="Type or select attendee names",
-                default=item_details["additionalAttendees"].split(", ") if item_details.get("additionalAttendees") is not None else None,
+                options=attendee_options,
+                format_func=lambda name: f"{name} ({attendee_designations[name]})" if attendee_designations.get(name) else name,
+                placeholder="Search above, then select attendee names",
+                default=saved_attendees or None,
                 key="attendees"
             )
 
@@ -244,15 +263,17 @@ def register_item_page():
                     file_size = humanize.naturalsize(attachment['file_size'])
                     cols[1].text(file_size)
                     
-                    # Column 3: Download button
-                    file_data = attachment['file_data']  # Get file data
-                    cols[2].download_button(
-                        "📥 Download",
-                        data=file_data,
-                        file_name=attachment['filename'],
-                        mime=attachment['file_type'],
-                        key=f"download_{attachment['id']}"
-                    )
+                    # Column 3: Download button, the file is only read when it is clicked
+                    if attachment_available(attachment['id']):
+                        cols[2].download_button(
+                            "📥 Download",
+                            data=functools.partial(read_attachment_for_download, attachment['id']),
+                            file_name=attachment['filename'],
+                            mime=attachment['file_type'],
+                            key=f"download_{attachment['id']}"
+                        )
+                    else:
+                        cols[2].warning("File no longer available")
                     
                     # Column 4: Delete button
                     if cols[3].button("🗑️", key=f"delete_{attachment['id']}"):
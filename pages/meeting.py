@@ -1,8 +1,9 @@
 import streamlit as st
-from backend.controller.meetingController import fetch_meeting_by_id, fetch_upcoming_meeting, delete_meeting, load_meeting_data
-from backend.controller.itemController import get_sorted_items_by_id, delete_item, get_total_duration
-from backend.controller.attendanceController import fetch_nonselect_attendance_by_meetingid, update_nonselect_attendance_by_meetingid
-from backend.controller.attachmentsController import get_attachments_for_item, delete_attachment_by_item_id
+from backend.controller.meetingController import fetch_meeting_by_id, fetch_upcoming_meeting, delete_meeting, load_meeting_data, load_meeting_bundle
+from backend.controller.itemController import delete_item
+from backend.controller.timelineController import get_meeting_timeline
+from backend.controller.attendanceController import NONSELECT_ATTENDANCE_COLUMNS, update_nonselect_attendance_by_meetingid
+from backend.controller.attachmentsController import get_attachment_metadata_for_item, get_attachment_metadata_for_items, delete_attachment_by_item_id
 from datetime import datetime
 from utils.dateUtils import *
 from utils.constants import Role
@@ -11,17 +12,22 @@ from streamlit_extras.switch_page_button import switch_page
 import pandas as pd
 from utils.commonUtils import get_purpose_color_and_value, get_status_color
 
-def display_items(items):
+def display_items(items, attachments_by_item=None, slots=None):
     if not items:
         st.info("No items found for this meeting.")
         return
     
+    if attachments_by_item is None:
+        attachments_by_item = get_attachment_metadata_for_items([item["id"] for item in items])
+    slots = slots or {}
+
     # Display items as cards
     for item in items:
-        attachments = get_attachments_for_item(item["id"])
+        attachments = attachments_by_item[item["id"]]
         file_names = [attachment['filename'] for attachment in attachments]
         status_color = get_status_color(item["status"])
         tier_color, tier_value = get_purpose_color_and_value(item["purpose"])
+        slot = slots.get(item["id"])
         with st.container():
             item_col, item_buttons_col = st.columns([4,1])
             with item_col:
@@ -32,7 +38,7 @@ def display_items(items):
                         <p style="margin: 4px 0; color: {status_color};"><strong>Status:</strong> {item['status']}</p>
                         <p style="margin: 4px 0;"><strong>Description:</strong> {item['description']}</p>
                         <p style="margin: 4px 0; color: {tier_color}"><strong>Purpose:</strong> {tier_value}</p>
-                        <p style="margin: 4px 0;"><strong>Duration:</strong> {item['duration']} minutes</p>
+                        <p style="margin: 4px 0;"><strong>Duration:</strong> {item['duration']} minutes{f" ({slot[0]} - {slot[1]})" if slot else ""}</p>
                         <p style="margin: 4px 0;"><strong>Owner:</strong> {item['itemOwner']}</p>
                         <p style="margin: 4px 0;"><strong>Additional Attendees:</strong> {item['additionalAttendees'] if item['additionalAttendees'] else "-"}</p>
                         <p style="margin: 4px 0;"><strong>Attachments:</strong> {", ".join(file_names) if len(file_names) > 0 else "-"}</p>
@@ -53,7 +59,7 @@ def confirm_delete_meeting(meeting_id):
 
 def confirm_delete_item(item_id, title):
     delete_item(item_id)
-    attachments = get_attachments_for_item(item_id)
+    attachments = get_attachment_metadata_for_item(item_id)
     if attachments is not None:
         delete_attachment_by_item_id(item_id)
     st.success(f"Item '{title}' deleted successfully.")
@@ -87,15 +93,12 @@ def handle_delete_item(item_id, title):
     if st.button("Delete"):
         confirm_delete_item(item_id, title)
 
-def fetch_meeting():
+def resolve_meeting_id():
+    """Returns the meeting id from the URL, or the upcoming meeting's. Its details come from the bundle."""
     if st.query_params.get('id') is not None:
-        meeting_id = st.query_params['id']
-        meeting_details = fetch_meeting_by_id(meeting_id)
-    else:
-        meeting_details = fetch_upcoming_meeting()
-        meeting_id = meeting_details['id']
-
-    return meeting_id, meeting_details
+        return st.query_params['id']
+    upcoming_meeting = fetch_upcoming_meeting()
+    return upcoming_meeting['id'] if upcoming_meeting is not None else None
 
 def display_meeting(meeting_id, meeting_details):
     st.session_state.delete_meeting_modal = False
@@ -138,11 +141,12 @@ def display_meeting(meeting_id, meeting_details):
             # Right column content
             with demand_col:
                 total_minutes = meeting_details['totalDuration']
-                minutes_taken = get_total_duration(meeting_id)
+                timeline = get_meeting_timeline(meeting_details)
+                minutes_taken = timeline["minutesTaken"]
                 st.subheader("Demand", divider=True)
                 st.write(f"**Duration:** {total_minutes} minutes")
                 st.write(f"**Time Taken:** {minutes_taken}")
-                st.write(f"**Time Left:** {total_minutes - minutes_taken}")
+                st.write(f"**Time Left:** {timeline['minutesLeft']}")
                 if (minutes_taken / total_minutes <= 1):
                     st.progress(minutes_taken / total_minutes)
                 st.markdown('</div>', unsafe_allow_html=True)
@@ -150,13 +154,13 @@ def display_meeting(meeting_id, meeting_details):
         if st.session_state.delete_meeting_modal:
             handle_delete_meeting(meeting_id, meeting_details["meetingTitle"])
 
-def display_items_and_attendance(meeting_id, meeting_details):
+def display_items_and_attendance(meeting_id, meeting_details, bundle):
     with st.container():
         items_col, attendance_col = st.columns(2)
         with items_col:
             st.subheader("Items Registered", divider="orange")
             st.link_button(label="Register New Item", url=f"/item-form?meeting-id={meeting_details['id']}", icon="📖")
-            display_items(get_sorted_items_by_id(meeting_id))
+            display_items(bundle["items"], bundle["attachments"], get_meeting_timeline(meeting_details)["slots"])
 
             if st.session_state.delete_item is not None:
                 item = st.session_state.delete_item
@@ -165,11 +169,7 @@ def display_items_and_attendance(meeting_id, meeting_details):
 
         with attendance_col:
             st.subheader("Attendance", divider="violet")
-            data = fetch_nonselect_attendance_by_meetingid(meeting_id)
-            df = pd.DataFrame(
-                data,
-                columns=["PerNum", "Name", "Designation", "MeetingId", "ItemID", "Attendance", "Role", "Remarks"]
-                )
+            df = pd.DataFrame(bundle["attendance"], columns=NONSELECT_ATTENDANCE_COLUMNS)
 
             edited_df = st.data_editor(
                 df, 
@@ -192,32 +192,37 @@ def display_items_and_attendance(meeting_id, meeting_details):
                 args=(df, st.session_state.nonselect_attendance,meeting_id),
             )
 
-meeting_id, meeting_details = fetch_meeting()
+meeting_id = resolve_meeting_id()
 
 # Display select box for users to choose meetings
-meetings = load_meeting_data()
+meetings = load_meeting_data() or []
+# A past meeting, e.g. one opened from the history page or calendar, is listed with the upcoming ones
+requested_meeting = fetch_meeting_by_id(meeting_id)
+if requested_meeting is not None and all(meeting["id"] != requested_meeting["id"] for meeting in meetings):
+    meetings = meetings + [requested_meeting]
 meetings = sorted(meetings, key=lambda x: x["meetingDate"])
 if not meetings:
     st.warning("No meetings found in the database.")
+    st.stop()
 
 # Create a dictionary for easy lookup of meeting IDs
 meeting_dict = {format_meeting_title(meeting): meeting["id"] for meeting in meetings}
 meeting_title_list = list(meeting_dict.keys())
 
-# Meeting selector using formatted titles
+# Meeting selector using formatted titles; nothing is selected for an unknown id
 selected_meeting_title = st.selectbox(
     "Select Meeting",
     options=meeting_title_list,
-    index=list(meeting_dict.values()).index(int(meeting_id))
+    index=list(meeting_dict.values()).index(requested_meeting["id"]) if requested_meeting is not None else None
 )
+if selected_meeting_title is None:
+    display_meeting(str(meeting_id), None)
+    st.stop()
 
 # Get the selected meeting ID
 selected_meeting_id = meeting_dict[selected_meeting_title]
 
-if (meeting_id != selected_meeting_id):
-    selected_meeting_details = fetch_meeting_by_id(selected_meeting_id)
-    display_meeting(selected_meeting_id, selected_meeting_details)
-    display_items_and_attendance(selected_meeting_id, selected_meeting_details)
-else:
-    display_meeting(meeting_id, meeting_details)
-    display_items_and_attendance(meeting_id, meeting_details)
+# Load the meeting, its items, attachments and attendance in one go
+bundle = load_meeting_bundle(selected_meeting_id)
+display_meeting(selected_meeting_id, bundle["meeting"])
+display_items_and_attendance(selected_meeting_id, bundle["meeting"], bundle)
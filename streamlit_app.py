@@ -39,6 +39,7 @@ role = st.session_state.role
 home_page = st.Page('pages/home.py', title='Overview', icon='🏠')
 
 meeting_page = st.Page('pages/meeting.py', title='Meeting', icon='💼')
+history_page = st.Page('pages/history.py', title='Meeting History', icon='🗂️')
 meeting_form_page = st.Page('pages/meetingForm.py', title='New Meeting', icon='➕', url_path="/meeting-form")
 
 agenda_page = st.Page('pages/agenda.py', title='Meeting Agenda', icon='📜')
@@ -51,12 +52,13 @@ settings_page = st.Page('pages/settings.py', title='Settings', icon='⚙️')
 
 attendance_page = st.Page('pages/attendance.py', title='Update Attendance', icon='🈁')
 
-general_pages = [home_page, meeting_page, item_form_page, settings_page]
-assistant_pages = [home_page, meeting_page, attendance_page, item_form_page, settings_page]
+general_pages = [home_page, meeting_page, history_page, item_form_page, settings_page]
+assistant_pages = [home_page, meeting_page, history_page, attendance_page, item_form_page, settings_page]
 secretariat_pages = {
   'Home': [
       home_page,
       meeting_page,
+      history_page,
       item_form_page,
     ],
     'For Secetariat': [
@@ -0,0 +1,37 @@
+import random
+
+from backend.controller.timelineController import AgendaTimeline
+
+
+def assert_same_timeline(timeline, rebuilt):
+    assert timeline.order == rebuilt.order
+    assert timeline.ends == rebuilt.ends
+    assert timeline.slots("15:00") == rebuilt.slots("15:00")
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    rng = random.Random(3)
+    items = {item_id: (float(item_id), rng.randint(0, 30)) for item_id in range(1, 21)}
+    timeline = AgendaTimeline([(item_id, key, duration) for item_id, (key, duration) in items.items()])
+    for _ in range(300):
+        item_id = rng.randint(1, 25)
+        key = rng.choice([0, None, rng.uniform(0.5, 25)])
+        duration = rng.choice([None, rng.randint(0, 30)])
+        timeline.update_item(item_id, key, duration)
+        if key:
+            items[item_id] = (key, duration)
+        else:
+            items.pop(item_id, None)
+
+        assert_same_timeline(timeline, AgendaTimeline([(i, k, d) for i, (k, d) in items.items()]))
+
+
+def test_sync_applies_a_changed_agenda_as_a_diff():
+    rng = random.Random(5)
+    timeline = AgendaTimeline()
+    for _ in range(100):
+        items = [(item_id, rng.uniform(0.5, 30), rng.randint(0, 30)) for item_id in rng.sample(range(1, 30), rng.randint(0, 15))]
+        timeline.sync(items)
+
+        assert_same_timeline(timeline, AgendaTimeline(items))
+        assert timeline.minutes_taken == sum(duration for _, _, duration in items)
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from backend.database import connectionManager
+
+
+@pytest.fixture
+def db_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(connectionManager, "DB_DIR", tmp_path)
+    connectionManager.close_connections()
+    yield tmp_path
+    connectionManager.close_connections()
+
+
+def connection_on_new_thread(db_name):
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(connectionManager.get_connection(db_name)[0]))
+    thread.start()
+    thread.join()
+    return seen[0]
+
+
+def test_ended_threads_hand_their_connection_to_the_next_thread(db_dir):
+    first = connection_on_new_thread("meeting.db")
+    second = connection_on_new_thread("meeting.db")
+
+    assert second is first
+    assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_open_transactions_are_rolled_back_before_pooling(db_dir):
+    def write_without_commit():
+        conn, _ = connectionManager.get_connection("meeting.db")
+        conn.execute("INSERT INTO meeting (meetingTitle) VALUES ('uncommitted')")
+
+    thread = threading.Thread(target=write_without_commit)
+    thread.start()
+    thread.join()
+
+    conn = connection_on_new_thread("meeting.db")
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM meeting WHERE meetingTitle = 'uncommitted'").fetchone()[0] == 0
@@ -0,0 +1,53 @@
+import random
+
+from backend.controller.itemController import plan_item_order
+
+
+def apply_plan(keys, plan):
+    keys.update(plan)
+    presented = sorted((key, item_id) for item_id, key in keys.items() if key > 0)
+    return [item_id for _, item_id in presented], [key for key, _ in presented]
+
+
+def move(order, item_id, position):
+    order = [other for other in order if other != item_id]
+    order.insert(min(position - 1, len(order)), item_id)
+    return order
+
+
+def test_moves_keep_keys_strictly_ordered():
+    rng = random.Random(7)
+    keys = {item_id: float(item_id) for item_id in range(1, 11)}
+    order = list(keys)
+    for _ in range(500):
+        item_id, position = rng.choice(order), rng.randint(1, len(order))
+        plan = plan_item_order([(i, keys[i]) for i in order], {item_id: position})
+        order = move(order, item_id, position)
+        new_order, new_keys = apply_plan(keys, plan)
+
+        assert new_order == order
+        assert all(low < high for low, high in zip(new_keys, new_keys[1:]))
+
+
+def test_keys_are_spread_out_again_when_they_get_too_close():
+    keys = {item_id: float(item_id) for item_id in range(1, 6)}
+    rebalanced = False
+    # Moving the last item to second place halves the gap after the first item each time
+    for _ in range(60):
+        order, _ = apply_plan(keys, {})
+        plan = plan_item_order([(i, keys[i]) for i in order], {order[-1]: 2})
+        rebalanced = rebalanced or len(plan) > 1
+        expected = move(order, order[-1], 2)
+        new_order, new_keys = apply_plan(keys, plan)
+
+        assert new_order == expected
+        assert all(low < high for low, high in zip(new_keys, new_keys[1:]))
+    assert rebalanced
+
+
+def test_position_zero_takes_an_item_off_the_agenda():
+    keys = {1: 1.0, 2: 2.0, 3: 3.0}
+    plan = plan_item_order(list(keys.items()), {2: 0})
+
+    assert plan == {2: 0}
+    assert apply_plan(keys, plan)[0] == [1, 3]
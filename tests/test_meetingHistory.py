@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from backend.database import connectionManager
+from backend.controller.meetingController import meeting_history_query
+
+TODAY = "2026-10-18"
+
+
+@pytest.fixture
+def meeting_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(connectionManager, "DB_DIR", tmp_path)
+    connectionManager.close_connections()
+    conn, _ = connectionManager.get_connection("meeting.db")
+    # Three meetings a day, so pages break in the middle of a date
+    conn.executemany(
+        "INSERT INTO meeting (meetingTitle, meetingDate, startTime, location, status) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"{day:02d}/{slot}", f"2026-{1 + day // 28:02d}-{1 + day % 28:02d}", f"{9 + slot}:00", "Orchard", ("Completed", "Curation")[(day + slot) % 2])
+            for day in range(0, 300, 3)
+            for slot in range(3)
+        ],
+    )
+    conn.commit()
+    yield conn
+    connectionManager.close_connections()
+
+
+def read_all_pages(conn, page_size, **filters):
+    pages, after = [], None
+    while True:
+        rows = conn.execute(*meeting_history_query(TODAY, after, page_size, **filters)).fetchall()
+        pages.append(rows[:page_size])
+        if len(rows) <= page_size:
+            return pages
+        last = rows[page_size - 1]
+        after = (last["meetingDate"], last["startTime"], last["id"])
+
+
+@pytest.mark.parametrize("filters", [{}, {"status": "Completed"}, {"date_to": "2026-05-10"}])
+def test_pages_follow_the_full_ordering(meeting_db, filters):
+    meeting_db.row_factory = sqlite3.Row
+    pages = read_all_pages(meeting_db, 7, **filters)
+    expected = meeting_db.execute(
+        """
+        SELECT * FROM meeting
+        WHERE meetingDate < ? AND (? IS NULL OR status = ?) AND (? IS NULL OR meetingDate <= ?)
+        ORDER BY meetingDate DESC, startTime DESC, id DESC
+        """,
+        (TODAY, filters.get("status"), filters.get("status"), filters.get("date_to"), filters.get("date_to")),
+    ).fetchall()
+
+    assert len(pages) > 2
+    assert [row["id"] for page in pages for row in page] == [row["id"] for row in expected]
+
+
+@pytest.mark.parametrize("status", [None, "Completed"])
+def test_later_pages_seek_to_the_cursor_date(meeting_db, status):
+    sql, params = meeting_history_query(TODAY, ("2026-03-05", "10:00", 40), 7, status=status)
+    plan = " ".join(row[3] for row in meeting_db.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    assert "meetingDate<?" in plan
+    assert "TEMP B-TREE" not in plan
+    assert params[0] == "2026-03-05"
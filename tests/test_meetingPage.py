@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from backend.database import connectionManager
+from utils.constants import Role
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "pages"
+
+
+@pytest.fixture
+def meeting_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(connectionManager, "DB_DIR", tmp_path)
+    connectionManager.close_connections()
+    conn, _ = connectionManager.get_connection("meeting.db")
+    conn.executemany(
+        """
+        INSERT INTO meeting (meetingTitle, meetingDate, description, startTime, endTime, totalDuration, location, createdBy, createdOn, status)
+        VALUES (?, ?, 'Test', '15:00', '17:30', 150, 'Orchard', 'Jia Wei', 1733825082, ?)
+        """,
+        [("01/20", "2020-01-05", "Completed"), ("01/99", "2099-01-05", "Curation")],
+    )
+    conn.commit()
+    yield conn
+    connectionManager.close_connections()
+
+
+def run_page(page, **query_params):
+    app = AppTest.from_file(str(PAGES_DIR / page), default_timeout=30)
+    app.session_state.role = Role.SECRETARIAT.value
+    for name, value in query_params.items():
+        app.query_params[name] = value
+    return app.run()
+
+
+def test_history_links_open_past_meetings(meeting_db):
+    history = run_page("history.py")
+    links = history.dataframe[0].value["link"].tolist()
+    assert links == ["/meeting?id=1"]
+
+    meeting = run_page("meeting.py", id=links[0].split("id=")[1])
+
+    assert not meeting.exception
+    assert meeting.title[0].value == "01/20 DM Meeting"
+    assert meeting.selectbox[0].value.startswith("01/20")
+
+
+def test_unknown_meeting_id_is_reported(meeting_db):
+    meeting = run_page("meeting.py", id="42")
+
+    assert not meeting.exception
+    assert meeting.title[0].value == "No Meeting found. Invalid Meeting ID: 42"
@@ -0,0 +1,47 @@
+import itertools
+import random
+
+from backend.controller.agendaController import item_priority, pack_agenda
+from utils.constants import Purpose_Lookup
+
+NOW = 1_800_000_000.0
+PURPOSES = [f":blue[{Purpose_Lookup.APPROVAL.value}]", f":blue[{Purpose_Lookup.DISCUSSION.value}]", f":orange[{Purpose_Lookup.INFO.value}]", None]
+
+
+def random_candidates(rng, count):
+    return [
+        {
+            "id": item_id,
+            "duration": rng.choice([None, 0, rng.randint(1, 60)]),
+            "purpose": rng.choice(PURPOSES),
+            "createdOn": NOW - rng.uniform(0, 500 * 86400),
+        }
+        for item_id in range(count)
+    ]
+
+
+def best_total_priority(candidates, capacity):
+    best = 0
+    for size in range(len(candidates) + 1):
+        for subset in itertools.combinations(candidates, size):
+            if sum(item["duration"] or 0 for item in subset) <= capacity:
+                best = max(best, sum(item_priority(item, NOW) for item in subset))
+    return best
+
+
+def test_chosen_items_fit_and_match_the_brute_force_optimum():
+    rng = random.Random(11)
+    for _ in range(200):
+        candidates = random_candidates(rng, rng.randint(0, 9))
+        capacity = rng.randint(0, 150)
+        chosen = pack_agenda(candidates, capacity, NOW)
+
+        assert len({item["id"] for item in chosen}) == len(chosen)
+        assert sum(item["duration"] or 0 for item in chosen) <= capacity
+        assert sum(item_priority(item, NOW) for item in chosen) == best_total_priority(candidates, capacity)
+
+
+def test_items_without_a_duration_always_fit():
+    candidates = [{"id": 1, "duration": None, "purpose": None, "createdOn": NOW}, {"id": 2, "duration": 30, "purpose": None, "createdOn": NOW}]
+
+    assert [item["id"] for item in pack_agenda(candidates, 0, NOW)] == [1]
@@ -9,9 +9,11 @@ Role = Enum('Role',
 Item_Status = Enum('Item_Status', 
                    [('PENDING', "Pending"), 
                     ('WAITLIST', "Waitlist"), 
+                    ('WAITLISTED', "Waitlisted"), 
                     ('REGISTERED', "Registered"), 
                     ('CONFIRMED', "Confirmed"),
-                    ('REJECTED', "REJECTED")])
+                    ('APPROVED', "Approved"),
+                    ('REJECTED', "Rejected")])
 
 Meeting_Status = Enum('Meeting_Status', 
                    [('CURATION', "Curation"), 
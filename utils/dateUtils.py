@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 def date_string_to_date_obj(date_string):
     return datetime.strptime(date_string, "%Y-%m-%d")
@@ -24,4 +24,18 @@ def datetime_string_to_date_and_time_object(date_time_string):
     # Extract the date object
     date_object = datetime_object.date()
     time_object = datetime_object.time()
-    return date_object, time_object
\ No newline at end of file
+    return date_object, time_object
+
+def calendar_month_window(month_start):
+    """
+    Returns the (first, last + 1 day) dates shown by a month calendar starting on Sundays.
+
+    The month grid always shows six weeks, starting on the Sunday on or before the 1st.
+    """
+    first_shown = month_start - timedelta(days=(month_start.weekday() + 1) % 7)
+    return first_shown, first_shown + timedelta(days=42)
+
+def shift_month(month_start, months):
+    """Returns the first day of the month months away from month_start."""
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)